@@ -0,0 +1,154 @@
+import asyncio
+import json
+import logging
+import os
+import uuid
+from typing import Callable, Optional
+
+import psycopg
+from sqlalchemy.engine import make_url
+
+logger = logging.getLogger(__name__)
+
+# Called with (session_id, message); returns True if a local socket took the message
+DeliverHandler = Callable[[str, dict], bool]
+
+
+class Broker:
+    """Fans session events out to whichever process holds the CTV socket.
+
+    `publish` is called by the process that produced the event; every process
+    (including the publisher) hands matching events to the handler given to
+    `start`, which delivers to its local sockets.
+    """
+
+    async def start(self, handler: DeliverHandler) -> None:
+        raise NotImplementedError
+
+    async def stop(self) -> None:
+        raise NotImplementedError
+
+    async def publish(self, session_id: str, message: dict) -> bool:
+        """Returns True if the message was delivered to a socket in this process."""
+        raise NotImplementedError
+
+
+class InMemoryBroker(Broker):
+    """Single-process broker: publishing is a direct local delivery."""
+
+    def __init__(self):
+        self._handler: Optional[DeliverHandler] = None
+
+    async def start(self, handler: DeliverHandler) -> None:
+        self._handler = handler
+
+    async def stop(self) -> None:
+        self._handler = None
+
+    async def publish(self, session_id: str, message: dict) -> bool:
+        if self._handler is None:
+            return False
+        return self._handler(session_id, message)
+
+
+class PostgresBroker(Broker):
+    """Cross-process broker over Postgres LISTEN/NOTIFY.
+
+    Every process LISTENs on one channel over a dedicated connection. Events are
+    delivered locally right away, then queued and sent as NOTIFYs in batches (one
+    round trip per batch) so other workers and nodes can deliver them too;
+    a process ignores notifications it sent itself.
+    """
+
+    CHANNEL = "ctv_events"
+    # NOTIFY payloads must stay under 8000 bytes
+    MAX_PAYLOAD_BYTES = 7900
+
+    def __init__(self, database_url: str, max_queue: int = 10000, batch_size: int = 100):
+        self.dsn = make_url(database_url).set(drivername="postgresql").render_as_string(hide_password=False)
+        self.max_queue = max_queue
+        self.batch_size = batch_size
+        self.origin = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self._handler: Optional[DeliverHandler] = None
+        self._outbox: Optional[asyncio.Queue[str]] = None
+        self._tasks: list[asyncio.Task] = []
+
+    async def start(self, handler: DeliverHandler) -> None:
+        self._handler = handler
+        self._outbox = asyncio.Queue(maxsize=self.max_queue)
+        self._tasks = [
+            asyncio.create_task(self._listen(), name="broker-listen"),
+            asyncio.create_task(self._notify(), name="broker-notify"),
+        ]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._handler = None
+
+    async def publish(self, session_id: str, message: dict) -> bool:
+        if self._handler is None or self._outbox is None:
+            return False
+        delivered = self._handler(session_id, message)
+        payload = json.dumps({"o": self.origin, "s": session_id, "m": message}, default=str)
+        if len(payload.encode("utf-8")) > self.MAX_PAYLOAD_BYTES:
+            logger.warning("Event for session %s too large for NOTIFY, not fanned out", session_id)
+            return delivered
+        try:
+            self._outbox.put_nowait(payload)
+        except asyncio.QueueFull:
+            logger.warning("Broker outbox full, event for session %s not fanned out", session_id)
+        return delivered
+
+    def _dispatch(self, payload: str) -> None:
+        try:
+            event = json.loads(payload)
+        except ValueError:
+            return
+        if event.get("o") == self.origin or self._handler is None:
+            return
+        self._handler(event["s"], event["m"])
+
+    async def _listen(self) -> None:
+        while True:
+            try:
+                async with await psycopg.AsyncConnection.connect(self.dsn, autocommit=True) as conn:
+                    await conn.execute(f"LISTEN {self.CHANNEL}")
+                    async for notify in conn.notifies():
+                        self._dispatch(notify.payload)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Broker listener lost its connection, reconnecting")
+                await asyncio.sleep(1)
+
+    async def _notify(self) -> None:
+        assert self._outbox is not None
+        while True:
+            try:
+                async with await psycopg.AsyncConnection.connect(self.dsn, autocommit=True) as conn:
+                    while True:
+                        batch = [await self._outbox.get()]
+                        while len(batch) < self.batch_size and not self._outbox.empty():
+                            batch.append(self._outbox.get_nowait())
+                        # Postgres collapses identical payloads within one transaction;
+                        # events carry ids/timestamps so this never drops a real event
+                        await conn.execute(
+                            "SELECT pg_notify(%s, payload) FROM unnest(%s::text[]) AS payload",
+                            (self.CHANNEL, batch),
+                        )
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Broker notifier lost its connection, reconnecting")
+                await asyncio.sleep(1)
+
+
+def create_broker(kind: str, database_url: str) -> Broker:
+    if kind == "memory":
+        return InMemoryBroker()
+    if kind == "postgres":
+        return PostgresBroker(database_url)
+    raise RuntimeError(f"Unknown WS_BROKER '{kind}' (expected 'memory' or 'postgres')")
@@ -0,0 +1,101 @@
+import asyncio
+from collections import OrderedDict
+from dataclasses import dataclass
+import time
+from typing import Any, Awaitable, Callable, Optional
+import uuid
+
+from app.core.config import settings
+from app.core.metrics import registry
+from app.models import Campaign
+
+campaign_cache_hits = registry.counter("campaign_cache_hits_total", "Campaign lookups served from cache")
+campaign_cache_misses = registry.counter("campaign_cache_misses_total", "Campaign lookups that were not cached")
+campaign_cache_loads = registry.counter("campaign_cache_loads_total", "Campaign rows loaded from the database")
+
+
+@dataclass(frozen=True)
+class CampaignSnapshot:
+    """The campaign fields the session hot path needs, decoded once."""
+
+    id: uuid.UUID
+    qr_base_url: str
+    interaction_config: list[dict[str, Any]]
+    is_active: bool
+
+    @classmethod
+    def from_campaign(cls, campaign: Campaign) -> "CampaignSnapshot":
+        return cls(
+            id=campaign.id,
+            qr_base_url=campaign.qr_base_url,
+            interaction_config=campaign.interaction_config or [],
+            is_active=campaign.is_active,
+        )
+
+
+class CampaignCache:
+    """Read-through TTL + LRU cache of campaign snapshots.
+
+    Loads are single-flight: concurrent misses on the same campaign share one
+    in-flight load, so a cold key costs a single query however many TVs register
+    at once. Missing campaigns are not cached.
+    """
+
+    def __init__(self, ttl: float, max_entries: int):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: OrderedDict[uuid.UUID, tuple[float, CampaignSnapshot]] = OrderedDict()
+        self._inflight: dict[uuid.UUID, asyncio.Future] = {}
+
+    async def get_or_load(
+        self,
+        campaign_id: uuid.UUID,
+        loader: Callable[[], Awaitable[Optional[CampaignSnapshot]]],
+    ) -> Optional[CampaignSnapshot]:
+        entry = self._entries.get(campaign_id)
+        if entry is not None and time.monotonic() < entry[0]:
+            self._entries.move_to_end(campaign_id)
+            campaign_cache_hits.inc()
+            return entry[1]
+        campaign_cache_misses.inc()
+
+        future = self._inflight.get(campaign_id)
+        if future is None:
+            # The load runs as its own task so a cancelled caller doesn't fail the others
+            future = asyncio.ensure_future(self._load(campaign_id, loader))
+            self._inflight[campaign_id] = future
+        return await asyncio.shield(future)
+
+    async def _load(
+        self,
+        campaign_id: uuid.UUID,
+        loader: Callable[[], Awaitable[Optional[CampaignSnapshot]]],
+    ) -> Optional[CampaignSnapshot]:
+        try:
+            campaign_cache_loads.inc()
+            snapshot = await loader()
+            if snapshot is not None:
+                self._store(campaign_id, snapshot)
+            return snapshot
+        finally:
+            self._inflight.pop(campaign_id, None)
+
+    def _store(self, campaign_id: uuid.UUID, snapshot: CampaignSnapshot) -> None:
+        self._entries[campaign_id] = (time.monotonic() + self.ttl, snapshot)
+        self._entries.move_to_end(campaign_id)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, campaign_id: uuid.UUID) -> None:
+        self._entries.pop(campaign_id, None)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+# Singleton instance shared across the app
+campaign_cache = CampaignCache(
+    ttl=settings.CAMPAIGN_CACHE_TTL_SECONDS,
+    max_entries=settings.CAMPAIGN_CACHE_MAX_ENTRIES,
+)
+registry.gauge("campaign_cache_entries", "Campaigns currently cached", callback=lambda: len(campaign_cache))
@@ -1,5 +1,6 @@
 import os
 from dotenv import load_dotenv
+from pydantic import model_validator
 from pydantic_settings import BaseSettings
 
 load_dotenv()
@@ -21,5 +22,85 @@ class Settings(BaseSettings):
     JWT_ALGORITHM: str = os.getenv("JWT_ALGORITHM", "HS256")
     JWT_ACCESS_TOKEN_EXPIRE_DAYS: int = int(os.getenv("JWT_ACCESS_TOKEN_EXPIRE_DAYS", "2"))
 
+    # "sync" writes each interaction in the request; "batched" queues it for write-behind
+    INTERACTION_INGESTION_MODE: str = os.getenv("INTERACTION_INGESTION_MODE", "sync")
+    INTERACTION_BATCH_SIZE: int = int(os.getenv("INTERACTION_BATCH_SIZE", "500"))
+    INTERACTION_FLUSH_INTERVAL_MS: int = int(os.getenv("INTERACTION_FLUSH_INTERVAL_MS", "50"))
+    INTERACTION_QUEUE_MAX: int = int(os.getenv("INTERACTION_QUEUE_MAX", "10000"))
+    # A flush that fails on a connection or lock error is retried this many times, backing off from
+    # INTERACTION_FLUSH_RETRY_BACKOFF_MS; after that its rows are dropped (interactions_dropped_total)
+    INTERACTION_FLUSH_RETRIES: int = int(os.getenv("INTERACTION_FLUSH_RETRIES", "3"))
+    INTERACTION_FLUSH_RETRY_BACKOFF_MS: int = int(os.getenv("INTERACTION_FLUSH_RETRY_BACKOFF_MS", "100"))
+    INTERACTION_BATCH_MAX_ITEMS: int = int(os.getenv("INTERACTION_BATCH_MAX_ITEMS", "100"))
+    # Cursor reads hold back rows younger than this, so rows committed slightly out of
+    # created_at order (concurrent requests, write-behind batches) are never skipped
+    INTERACTION_CURSOR_SETTLE_MS: int = int(os.getenv("INTERACTION_CURSOR_SETTLE_MS", "500"))
+
+    # Per-CTV-socket outbound buffer; a consumer that falls this far behind is dropped
+    WS_SEND_QUEUE_MAX: int = int(os.getenv("WS_SEND_QUEUE_MAX", "256"))
+    # "memory" (single process) or "postgres" (LISTEN/NOTIFY, needed for several workers)
+    WS_BROKER: str = os.getenv("WS_BROKER", "memory")
+
+    # Upper bound; each entry also expires with its session's expires_at
+    SESSION_STATE_CACHE_TTL_SECONDS: float = float(os.getenv("SESSION_STATE_CACHE_TTL_SECONDS", "120"))
+    SESSION_STATE_CACHE_MAX_ENTRIES: int = int(os.getenv("SESSION_STATE_CACHE_MAX_ENTRIES", "100000"))
+    CAMPAIGN_CACHE_TTL_SECONDS: float = float(os.getenv("CAMPAIGN_CACHE_TTL_SECONDS", "60"))
+    CAMPAIGN_CACHE_MAX_ENTRIES: int = int(os.getenv("CAMPAIGN_CACHE_MAX_ENTRIES", "1024"))
+
+    SESSION_EXPIRY_SWEEP_INTERVAL_SECONDS: float = float(os.getenv("SESSION_EXPIRY_SWEEP_INTERVAL_SECONDS", "5"))
+    SESSION_EXPIRY_SWEEP_BATCH_SIZE: int = int(os.getenv("SESSION_EXPIRY_SWEEP_BATCH_SIZE", "500"))
+    SESSION_EXPIRY_SWEEP_MAX_BATCHES: int = int(os.getenv("SESSION_EXPIRY_SWEEP_MAX_BATCHES", "20"))
+
+    LONG_POLL_MAX_WAIT_SECONDS: int = int(os.getenv("LONG_POLL_MAX_WAIT_SECONDS", "30"))
+    LONG_POLL_MAX_WAITERS: int = int(os.getenv("LONG_POLL_MAX_WAITERS", "10000"))
+
+    SSE_MAX_STREAMS: int = int(os.getenv("SSE_MAX_STREAMS", "50000"))
+    SSE_QUEUE_MAX: int = int(os.getenv("SSE_QUEUE_MAX", "256"))
+    SSE_HEARTBEAT_SECONDS: float = float(os.getenv("SSE_HEARTBEAT_SECONDS", "15"))
+    # Max interactions replayed from the table when a stream resumes with Last-Event-ID
+    SSE_REPLAY_LIMIT: int = int(os.getenv("SSE_REPLAY_LIMIT", "1000"))
+
+    # argon2 runs on its own thread pool; operations beyond workers + queue get a 503
+    PASSWORD_HASH_WORKERS: int = int(os.getenv("PASSWORD_HASH_WORKERS", "2"))
+    PASSWORD_HASH_QUEUE_MAX: int = int(os.getenv("PASSWORD_HASH_QUEUE_MAX", "16"))
+    # argon2 costs for new hashes; defaults are argon2-cffi's. Deployments pin values
+    # calibrated on their hardware with `python -m app.core.password_hashing`
+    PASSWORD_HASH_TIME_COST: int = int(os.getenv("PASSWORD_HASH_TIME_COST", "3"))
+    PASSWORD_HASH_MEMORY_KIB: int = int(os.getenv("PASSWORD_HASH_MEMORY_KIB", "65536"))
+
+    # Interaction exports read a server-side cursor this many rows at a time
+    EXPORT_CHUNK_ROWS: int = int(os.getenv("EXPORT_CHUNK_ROWS", "1000"))
+    # Each streaming export holds one DB connection
+    EXPORT_MAX_CONCURRENT: int = int(os.getenv("EXPORT_MAX_CONCURRENT", "4"))
+
+    # How often the event-loop lag probe wakes up
+    EVENT_LOOP_PROBE_INTERVAL_MS: int = int(os.getenv("EVENT_LOOP_PROBE_INTERVAL_MS", "100"))
+
+    # Shared directory for per-worker metric snapshots; set it when running several workers
+    METRICS_DIR: str = os.getenv("METRICS_DIR", "")
+    METRICS_FLUSH_INTERVAL_SECONDS: float = float(os.getenv("METRICS_FLUSH_INTERVAL_SECONDS", "5"))
+
+    # Fraction of HTTP requests whose SQL is counted and timed (0 disables it, 1 for query budgets)
+    SQL_INSTRUMENTATION_SAMPLE_RATE: float = float(os.getenv("SQL_INSTRUMENTATION_SAMPLE_RATE", "0.05"))
+    SQL_SLOW_QUERY_MS: float = float(os.getenv("SQL_SLOW_QUERY_MS", "200"))
+    SQL_REPEATED_STATEMENT_THRESHOLD: int = int(os.getenv("SQL_REPEATED_STATEMENT_THRESHOLD", "5"))
+    SQL_TIMING_HEADERS: bool = os.getenv("SQL_TIMING_HEADERS", "false").lower() == "true"
+
+    # Request profiling: a request is profiled when it carries a valid X-Profile
+    # signature (HMAC of a timestamp with PROFILING_SECRET) or is sampled.
+    # Sampling requires the secret: without it the debug endpoints that read
+    # the profiles always answer 403
+    PROFILING_SECRET: str = os.getenv("PROFILING_SECRET", "")
+    PROFILING_SAMPLE_RATE: float = float(os.getenv("PROFILING_SAMPLE_RATE", "0"))
+    PROFILING_INTERVAL_MS: float = float(os.getenv("PROFILING_INTERVAL_MS", "5"))
+    PROFILING_KEEP: int = int(os.getenv("PROFILING_KEEP", "20"))
+    PROFILING_MAX_ACTIVE: int = int(os.getenv("PROFILING_MAX_ACTIVE", "4"))
+
+    @model_validator(mode="after")
+    def _profiling_sampling_needs_secret(self) -> "Settings":
+        if self.PROFILING_SAMPLE_RATE > 0 and not self.PROFILING_SECRET:
+            raise ValueError("PROFILING_SAMPLE_RATE requires PROFILING_SECRET (profiles are only readable with it)")
+        return self
+
 
 settings = Settings()
@@ -1,11 +1,12 @@
 from typing import Annotated, Optional
-from fastapi import Depends, HTTPException, Request, status
+from fastapi import Depends, Header, HTTPException, Request, status
 import jwt
 from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from app.core.exceptions import UserTokenInvalidException
+from app.core.exceptions import ProfilingAccessDeniedException, UserTokenInvalidException
 from app.crud.user_crud import get_user_by_email
-from app.db import get_session
+from app.db import get_async_session, get_session
 from app.models.token import TokenData
 from app.models.user import UserResponseWithId
 from app.services.user_service import UserService
@@ -14,6 +15,7 @@ from app.services.campaign_service import CampaignService
 from app.services.session_service import SessionService
 from app.core.config import settings
 from app.core.security import oauth2_scheme
+from app.core.profiling import verify_profile_signature
 
 COOKIE_NAME = "access_token"
 
@@ -30,7 +32,7 @@ def get_campaign_service(session: Session = Depends(get_session)) -> CampaignSer
     return CampaignService(session)
 
 
-def get_session_service(session: Session = Depends(get_session)) -> SessionService:
+def get_session_service(session: AsyncSession = Depends(get_async_session)) -> SessionService:
     return SessionService(session)
 
 
@@ -71,3 +73,9 @@ def get_current_active_user(
     current_user: UserResponseWithId = Depends(get_current_user),
 ):
     return current_user
+
+
+async def require_profile_signature(x_profile: Optional[str] = Header(default=None)) -> None:
+    """Debug endpoints take the same signed X-Profile header that triggers profiling."""
+    if not verify_profile_signature(x_profile):
+        raise ProfilingAccessDeniedException()
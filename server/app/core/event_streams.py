@@ -0,0 +1,76 @@
+import asyncio
+import json
+import logging
+from typing import Optional
+
+from app.core.config import settings
+from app.core.exceptions import StreamCapacityException
+from app.core.metrics import registry
+from app.core.ws_manager import ws_manager
+
+logger = logging.getLogger(__name__)
+
+streams_dropped = registry.counter("sse_streams_dropped_total", "SSE streams closed for falling too far behind")
+
+
+def format_sse(event: str, data: dict, event_id: Optional[str] = None) -> str:
+    lines = []
+    if event_id:
+        lines.append(f"id: {event_id}")
+    lines.append(f"event: {event}")
+    lines.append(f"data: {json.dumps(data, separators=(',', ':'))}")
+    return "\n".join(lines) + "\n\n"
+
+
+class Subscription:
+    def __init__(self, max_queue: int):
+        self.queue: asyncio.Queue[dict] = asyncio.Queue(maxsize=max_queue)
+        self.dropped = False
+
+
+class SessionEventStreams:
+    """Per-session fan-out of delivered events to SSE subscribers.
+
+    Fed by `ws_manager` listeners, i.e. the same events pushed to CTV sockets.
+    Each subscriber has a bounded queue; one that overflows is marked dropped
+    and its stream ends, mirroring the WebSocket slow-consumer policy.
+    """
+
+    def __init__(self, max_queue: int, max_streams: int):
+        self.max_queue = max_queue
+        self.max_streams = max_streams
+        self._subscribers: dict[str, set[Subscription]] = {}
+        self.count = 0
+
+    def subscribe(self, session_id: str) -> Subscription:
+        if self.count >= self.max_streams:
+            raise StreamCapacityException()
+        subscription = Subscription(self.max_queue)
+        self._subscribers.setdefault(session_id, set()).add(subscription)
+        self.count += 1
+        return subscription
+
+    def unsubscribe(self, session_id: str, subscription: Subscription) -> None:
+        subscribers = self._subscribers.get(session_id)
+        if subscribers is None or subscription not in subscribers:
+            return
+        subscribers.discard(subscription)
+        self.count -= 1
+        if not subscribers:
+            del self._subscribers[session_id]
+
+    def on_event(self, session_id: str, message: dict) -> None:
+        for subscription in list(self._subscribers.get(session_id, ())):
+            try:
+                subscription.queue.put_nowait(message)
+            except asyncio.QueueFull:
+                logger.warning("Dropping slow SSE consumer for session %s", session_id)
+                subscription.dropped = True
+                streams_dropped.inc()
+                self.unsubscribe(session_id, subscription)
+
+
+# Singleton instance shared across the app
+event_streams = SessionEventStreams(max_queue=settings.SSE_QUEUE_MAX, max_streams=settings.SSE_MAX_STREAMS)
+ws_manager.add_listener(event_streams.on_event)
+registry.gauge("sse_streams_open", "SSE streams currently open", callback=lambda: event_streams.count)
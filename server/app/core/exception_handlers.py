@@ -1,6 +1,21 @@
 from fastapi.responses import JSONResponse
 from fastapi import Request
-import traceback
+import logging
+
+from app.core.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+app_exception_responses = registry.counter(
+    "app_exception_responses_total",
+    "Error responses by AppException subclass",
+    labelnames=("exception",),
+)
+unhandled_exceptions = registry.counter(
+    "unhandled_exceptions_total",
+    "Requests that failed with an unexpected exception, by exception type",
+    labelnames=("exception",),
+)
 
 
 async def app_exception_handler(request: Request, exc: Exception) -> JSONResponse:
@@ -11,6 +26,7 @@ async def app_exception_handler(request: Request, exc: Exception) -> JSONRespons
     """
     # We can safely access these attributes because FastAPI routes 
     # AppException instances to this handler
+    app_exception_responses.labels(type(exc).__name__).inc()
     return JSONResponse(
         status_code=getattr(exc, "status_code", 500),
         content={"error": getattr(exc, "detail", str(exc)), "code": getattr(exc, "status_code", 500)}
@@ -27,7 +43,8 @@ async def http_exception_handler(request: Request, exc: Exception) -> JSONRespon
 
 async def unhandled_exception_handler(request: Request, exc: Exception) -> JSONResponse:
     """Catch-all for unexpected errors. Log them and return generic 500."""
-    print(f"[ERROR] Unexpected error: {exc}\n{traceback.format_exc()}")
+    unhandled_exceptions.labels(type(exc).__name__).inc()
+    logger.error("Unexpected error on %s %s", request.method, request.url.path, exc_info=exc)
     return JSONResponse(
         status_code=500,
         content={"error": "An unexpected error occurred", "code": 500}
@@ -27,6 +27,14 @@ class InvalidInputException(AppException):
 
 # ─── User errors ─────────────────────────────────────────────────────────────
 
+class PasswordHashingBusyException(AppException):
+    def __init__(self):
+        super().__init__(
+            detail="Too many sign-ins in progress, retry shortly",
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        )
+
+
 class UserCredentialsException(AppException):
     def __init__(self):
         super().__init__(
@@ -159,3 +167,53 @@ class InteractionTokenInvalidException(AppException):
             detail="Interaction token is missing, invalid, or expired",
             status_code=status.HTTP_401_UNAUTHORIZED,
         )
+
+
+class InteractionQueueFullException(AppException):
+    def __init__(self):
+        super().__init__(
+            detail="Interaction ingestion queue is full, retry shortly",
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        )
+
+
+class StreamCapacityException(AppException):
+    def __init__(self):
+        super().__init__(
+            detail="Too many open event streams, retry shortly",
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        )
+
+
+class ExportCapacityException(AppException):
+    def __init__(self):
+        super().__init__(
+            detail="Too many exports in progress, retry shortly",
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        )
+
+
+class InteractionBatchTooLargeException(AppException):
+    def __init__(self, max_items: int):
+        super().__init__(
+            detail=f"Interaction batch exceeds the maximum of {max_items} items",
+            status_code=status.HTTP_413_CONTENT_TOO_LARGE,
+        )
+
+
+# ─── Debug errors ────────────────────────────────────────────────────────────
+
+class ProfilingAccessDeniedException(AppException):
+    def __init__(self):
+        super().__init__(
+            detail="Profiling is disabled or the signature is missing, invalid, or expired",
+            status_code=status.HTTP_403_FORBIDDEN,
+        )
+
+
+class ProfileNotFoundException(AppException):
+    def __init__(self, profile_id: str):
+        super().__init__(
+            detail=f"Profile {profile_id} not found (evicted or never recorded)",
+            status_code=status.HTTP_404_NOT_FOUND,
+        )
@@ -0,0 +1,88 @@
+import asyncio
+from datetime import datetime
+import logging
+import time
+from typing import Optional
+
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.config import settings
+from app.core.metrics import registry
+from app.crud.session_crud import expire_sessions_batch_async
+from app.db import async_engine
+
+logger = logging.getLogger(__name__)
+
+sweeps_total = registry.counter("session_expiry_sweeps_total", "Expiry sweeps run")
+sweep_seconds_total = registry.counter("session_expiry_sweep_seconds_total", "Time spent in expiry sweeps")
+sessions_expired_total = registry.counter("ctv_sessions_expired_total", "CTV sessions flipped to expired by the sweeper")
+last_sweep_seconds = registry.gauge(
+    "session_expiry_last_sweep_seconds",
+    "Duration of the last expiry sweep",
+    multiprocess_mode="max",
+)
+last_sweep_rows = registry.gauge(
+    "session_expiry_last_sweep_rows",
+    "Sessions expired by the last sweep",
+    multiprocess_mode="max",
+)
+
+
+class ExpirySweeper:
+    """Periodically marks overdue sessions as expired.
+
+    Each run expires sessions in batches of `batch_size` (one short transaction
+    each) until a batch comes back short or `max_batches` is reached, so a
+    backlog is worked off over several runs instead of in one long lock.
+    """
+
+    def __init__(self, interval: float, batch_size: int, max_batches: int):
+        self.interval = interval
+        self.batch_size = batch_size
+        self.max_batches = max_batches
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        self._task = asyncio.create_task(self._run(), name="session-expiry-sweeper")
+
+    async def stop(self) -> None:
+        if not self._task:
+            return
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+
+    async def sweep(self) -> int:
+        start = time.perf_counter()
+        expired = 0
+        for _ in range(self.max_batches):
+            async with AsyncSession(async_engine) as db, db.begin():
+                count = await expire_sessions_batch_async(datetime.now(), self.batch_size, db)
+            expired += count
+            if count < self.batch_size:
+                break
+        elapsed = time.perf_counter() - start
+        sweeps_total.inc()
+        sweep_seconds_total.inc(elapsed)
+        sessions_expired_total.inc(expired)
+        last_sweep_seconds.set(elapsed)
+        last_sweep_rows.set(expired)
+        return expired
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.sweep()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Session expiry sweep failed")
+            await asyncio.sleep(self.interval)
+
+
+# Singleton instance shared across the app
+expiry_sweeper = ExpirySweeper(
+    interval=settings.SESSION_EXPIRY_SWEEP_INTERVAL_SECONDS,
+    batch_size=settings.SESSION_EXPIRY_SWEEP_BATCH_SIZE,
+    max_batches=settings.SESSION_EXPIRY_SWEEP_MAX_BATCHES,
+)
@@ -0,0 +1,109 @@
+from contextlib import contextmanager
+import csv
+from datetime import datetime
+import io
+from typing import Iterator, Optional, Sequence
+
+import orjson
+from sqlalchemy import Row
+from starlette.responses import StreamingResponse
+from starlette.types import Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.exceptions import ExportCapacityException
+from app.core.metrics import registry
+from app.models.interaction import InteractionExportFormat
+
+MEDIA_TYPES = {
+    InteractionExportFormat.ndjson: "application/x-ndjson",
+    InteractionExportFormat.csv: "text/csv; charset=utf-8",
+}
+CSV_HEADER = ("id", "session_id", "action_type", "payload", "created_at", "session_created_at", "session_paired_at")
+# Spreadsheet apps run cells starting with these as formulas
+CSV_FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+export_rows = registry.counter("interaction_export_rows_total", "Interaction rows written by exports")
+
+
+def _iso(value: Optional[datetime]) -> str:
+    return value.isoformat() if value else ""
+
+
+def _text_cell(value: str) -> str:
+    return f"'{value}" if value.startswith(CSV_FORMULA_PREFIXES) else value
+
+
+def ndjson_chunk(rows: Sequence[Row]) -> bytes:
+    return b"".join(orjson.dumps(row._asdict()) + b"\n" for row in rows)
+
+
+def csv_header() -> bytes:
+    return csv_chunk_from([CSV_HEADER])
+
+
+def csv_chunk(rows: Sequence[Row]) -> bytes:
+    return csv_chunk_from(
+        (
+            row.id,
+            row.session_id,
+            _text_cell(row.action_type),
+            orjson.dumps(row.payload or {}).decode("utf-8"),
+            _iso(row.created_at),
+            _iso(row.session_created_at),
+            _iso(row.session_paired_at),
+        )
+        for row in rows
+    )
+
+
+def csv_chunk_from(records) -> bytes:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(records)
+    return buffer.getvalue().encode("utf-8")
+
+
+class ExportLimiter:
+    """Caps concurrent exports, since each one holds a DB connection while it streams.
+
+    `active` is only touched from the event loop. `slot()` checks and takes a
+    slot with no await in between, so two requests cannot both take the last one.
+    """
+
+    def __init__(self, max_active: int):
+        self.max_active = max_active
+        self.active = 0
+        registry.gauge("interaction_exports_open", "Interaction exports streaming", callback=lambda: self.active)
+
+    @contextmanager
+    def slot(self) -> Iterator[None]:
+        if self.active >= self.max_active:
+            raise ExportCapacityException()
+        self.active += 1
+        try:
+            yield
+        finally:
+            self.active -= 1
+
+
+class ExportResponse(StreamingResponse):
+    """Streams an export while holding one of `export_limiter`'s slots.
+
+    The slot is taken when the response starts, before any header is sent, so
+    a full limiter still gets a 503. It is released when the response ends,
+    whether it finished, failed, or the client left. The body iterator is
+    closed at the same point, so its DB connection goes back to the pool
+    without waiting for garbage collection.
+    """
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        with export_limiter.slot():
+            try:
+                await super().__call__(scope, receive, send)
+            finally:
+                aclose = getattr(self.body_iterator, "aclose", None)
+                if aclose:
+                    await aclose()
+
+
+# Singleton instance shared across the app
+export_limiter = ExportLimiter(max_active=settings.EXPORT_MAX_CONCURRENT)
@@ -0,0 +1,153 @@
+import asyncio
+import logging
+import uuid
+from typing import Optional
+
+from sqlalchemy import insert
+from sqlalchemy.exc import DataError, IntegrityError, InterfaceError, OperationalError
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+from app.core.config import settings
+from app.core.exceptions import InteractionQueueFullException
+from app.core.metrics import registry
+from app.db import async_engine
+from app.models import Interaction
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+# Worth retrying as is: lost connections, lock timeouts, pool exhaustion
+TRANSIENT_ERRORS = (OperationalError, InterfaceError, PoolTimeoutError, OSError)
+# Caused by some row of the batch, e.g. a session deleted while its interactions were queued
+ROW_ERRORS = (IntegrityError, DataError)
+
+interactions_dropped = registry.counter(
+    "interactions_dropped_total",
+    "Acknowledged interactions the write-behind buffer failed to write",
+    labelnames=("reason",),
+)
+
+
+class InteractionIngestor:
+    """Write-behind buffer for interactions.
+
+    Requests enqueue validated interactions and return immediately; a single
+    background task drains the queue and writes rows with one multi-row INSERT
+    per batch. A batch is flushed when it reaches `batch_size` rows or when
+    `flush_interval` seconds have passed since its first row, whichever comes
+    first. Rows still queued at shutdown are flushed by `stop()`.
+
+    A failed flush is retried `retries` times with exponential backoff when
+    the error is transient. When a row is at fault, the batch is split in
+    halves until only the offending rows are left out. Rows that still cannot
+    be written are counted in `interactions_dropped_total`.
+    """
+
+    def __init__(self, batch_size: int, flush_interval: float, max_queue: int, retries: int, retry_backoff: float):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_queue = max_queue
+        self.retries = retries
+        self.retry_backoff = retry_backoff
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._closing = False
+
+    @property
+    def enabled(self) -> bool:
+        return self._task is not None and not self._closing
+
+    @property
+    def depth(self) -> int:
+        return self._queue.qsize() if self._queue else 0
+
+    async def start(self) -> None:
+        self._queue = asyncio.Queue(maxsize=self.max_queue)
+        self._closing = False
+        self._task = asyncio.create_task(self._run(), name="interaction-ingestor")
+
+    async def stop(self) -> None:
+        """Stop accepting rows and wait until everything queued is written."""
+        if not self._task or not self._queue:
+            return
+        self._closing = True
+        await self._queue.put(_STOP)
+        await self._task
+        self._task = None
+
+    def submit(self, session_id: uuid.UUID, action_type: str, payload: dict) -> Interaction:
+        """Queue an interaction for the next flush. Ids and timestamps are generated
+        here so the caller can answer before the row is written."""
+        if not self.enabled or not self._queue:
+            raise InteractionQueueFullException()
+        interaction = Interaction(session_id=session_id, action_type=action_type, payload=payload)
+        try:
+            self._queue.put_nowait(interaction)
+        except asyncio.QueueFull:
+            raise InteractionQueueFullException()
+        return interaction
+
+    async def _run(self) -> None:
+        assert self._queue is not None
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            first = await self._queue.get()
+            if first is _STOP:
+                break
+            batch = [first]
+            deadline = loop.time() + self.flush_interval
+            while len(batch) < self.batch_size:
+                try:
+                    item = self._queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    remaining = deadline - loop.time()
+                    if remaining <= 0:
+                        break
+                    try:
+                        item = await asyncio.wait_for(self._queue.get(), remaining)
+                    except TimeoutError:
+                        break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+            await self._flush(batch)
+
+    async def _flush(self, batch: list[Interaction]) -> None:
+        try:
+            await self._insert(batch)
+        except ROW_ERRORS as exc:
+            if len(batch) == 1:
+                logger.warning("Dropped interaction %s of session %s: %s", batch[0].id, batch[0].session_id, exc.orig)
+                interactions_dropped.labels("rejected").inc()
+                return
+            middle = len(batch) // 2
+            await self._flush(batch[:middle])
+            await self._flush(batch[middle:])
+        except Exception:
+            logger.exception("Dropped a batch of %d interactions after a failed flush", len(batch))
+            interactions_dropped.labels("error").inc(len(batch))
+
+    async def _insert(self, batch: list[Interaction]) -> None:
+        rows = [interaction.model_dump() for interaction in batch]
+        for attempt in range(self.retries + 1):
+            try:
+                async with async_engine.begin() as conn:
+                    await conn.execute(insert(Interaction).values(rows))
+                return
+            except TRANSIENT_ERRORS:
+                if attempt == self.retries:
+                    raise
+                await asyncio.sleep(self.retry_backoff * 2**attempt)
+
+
+# Singleton instance shared across the app
+interaction_ingestor = InteractionIngestor(
+    batch_size=settings.INTERACTION_BATCH_SIZE,
+    flush_interval=settings.INTERACTION_FLUSH_INTERVAL_MS / 1000,
+    max_queue=settings.INTERACTION_QUEUE_MAX,
+    retries=settings.INTERACTION_FLUSH_RETRIES,
+    retry_backoff=settings.INTERACTION_FLUSH_RETRY_BACKOFF_MS / 1000,
+)
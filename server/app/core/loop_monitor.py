@@ -0,0 +1,50 @@
+import asyncio
+import logging
+from typing import Optional
+
+from app.core.config import settings
+from app.core.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+LAG_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+event_loop_lag = registry.histogram(
+    "event_loop_lag_seconds",
+    "How late the event loop woke a periodic probe",
+    buckets=LAG_BUCKETS,
+)
+
+
+class EventLoopMonitor:
+    """Measures event-loop lag.
+
+    A task sleeps for `interval` seconds in a loop. Anything past that when it
+    wakes up is time the loop spent busy with other callbacks. Sustained lag
+    means the worker is saturated, whatever the request latency says.
+    """
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        self._task = asyncio.create_task(self._run(), name="event-loop-monitor")
+
+    async def stop(self) -> None:
+        if not self._task:
+            return
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            await asyncio.sleep(self.interval)
+            event_loop_lag.observe(max(0.0, loop.time() - started - self.interval))
+
+
+# Singleton instance shared across the app
+loop_monitor = EventLoopMonitor(interval=settings.EVENT_LOOP_PROBE_INTERVAL_MS / 1000)
@@ -0,0 +1,304 @@
+from bisect import bisect_left
+import json
+import os
+import threading
+from typing import Callable, Iterable, Optional
+
+# (sample name, label pairs, value)
+Sample = tuple[str, tuple[tuple[str, str], ...], float]
+
+
+class _Metric:
+    """Base for metric families. With `labelnames`, the metric itself records
+    nothing: `labels(...)` returns (and caches) one child per label combination.
+
+    Metrics are updated from the event loop and from threadpool threads (sync
+    routes, sync engine events, pool checkouts). Every update takes the
+    metric's own lock, so concurrent increments are never lost.
+    """
+
+    type = "untyped"
+
+    def __init__(self, name: str, description: str, labelnames: tuple[str, ...] = ()):
+        self.name = name
+        self.description = description
+        self.labelnames = labelnames
+        self.labelvalues: tuple[str, ...] = ()
+        self.children: dict[tuple[str, ...], "_Metric"] = {}
+        self._lock = threading.Lock()
+
+    def labels(self, *values: str):
+        if len(values) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}")
+        child = self.children.get(values)
+        if child is None:
+            with self._lock:
+                child = self.children.get(values)
+                if child is None:
+                    child = self._child()
+                    child.labelnames = self.labelnames
+                    child.labelvalues = values
+                    self.children[values] = child
+        return child
+
+    def _child(self) -> "_Metric":
+        raise NotImplementedError
+
+    def _own_samples(self) -> list[Sample]:
+        raise NotImplementedError
+
+    def _label_pairs(self) -> tuple[tuple[str, str], ...]:
+        return tuple(zip(self.labelnames, self.labelvalues))
+
+    def samples(self) -> list[Sample]:
+        if not self.labelnames:
+            return self._own_samples()
+        samples: list[Sample] = []
+        for child in list(self.children.values()):
+            samples.extend(child._own_samples())
+        return samples
+
+
+class Counter(_Metric):
+    """Monotonic counter. An increment is an uncontended lock and an addition,
+    so it costs next to nothing on the hot path."""
+
+    type = "counter"
+
+    def __init__(self, name: str, description: str, labelnames: tuple[str, ...] = ()):
+        super().__init__(name, description, labelnames)
+        self.value = 0.0
+
+    def inc(self, amount: float = 1) -> None:
+        with self._lock:
+            self.value += amount
+
+    def _child(self) -> "Counter":
+        return Counter(self.name, self.description)
+
+    def _own_samples(self) -> list[Sample]:
+        return [(self.name, self._label_pairs(), self.value)]
+
+
+class Gauge(_Metric):
+    """Point-in-time value, either set explicitly or read from a callback at scrape time.
+
+    `multiprocess_mode` says how values from several workers are combined:
+    "sum" (connections, queue depths) or "max" (durations of the last run).
+    Gauges of workers that are no longer running are dropped either way.
+    """
+
+    type = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        description: str,
+        callback: Optional[Callable[[], float]] = None,
+        labelnames: tuple[str, ...] = (),
+        multiprocess_mode: str = "sum",
+    ):
+        super().__init__(name, description, labelnames)
+        self.callback = callback
+        self.multiprocess_mode = multiprocess_mode
+        self.value = 0.0
+
+    def set(self, value: float) -> None:
+        with self._lock:
+            self.value = value
+
+    def inc(self, amount: float = 1) -> None:
+        with self._lock:
+            self.value += amount
+
+    def dec(self, amount: float = 1) -> None:
+        with self._lock:
+            self.value -= amount
+
+    def set_function(self, callback: Callable[[], float]) -> None:
+        self.callback = callback
+
+    def _child(self) -> "Gauge":
+        return Gauge(self.name, self.description)
+
+    def _own_samples(self) -> list[Sample]:
+        value = self.callback() if self.callback else self.value
+        return [(self.name, self._label_pairs(), value)]
+
+
+class Histogram(_Metric):
+    """Cumulative-bucket histogram (Prometheus semantics)."""
+
+    type = "histogram"
+
+    DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+    def __init__(
+        self,
+        name: str,
+        description: str,
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+        labelnames: tuple[str, ...] = (),
+    ):
+        super().__init__(name, description, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            self.sum += value
+            self.counts[index] += 1
+
+    def _child(self) -> "Histogram":
+        return Histogram(self.name, self.description, self.buckets)
+
+    def _own_samples(self) -> list[Sample]:
+        labels = self._label_pairs()
+        # Copied together so the buckets, sum and count agree with each other
+        with self._lock:
+            counts, total = list(self.counts), self.sum
+        samples: list[Sample] = []
+        cumulative = 0
+        for bound, count in zip(self.buckets, counts):
+            cumulative += count
+            samples.append((f"{self.name}_bucket", labels + (("le", str(bound)),), cumulative))
+        cumulative += counts[-1]
+        samples.append((f"{self.name}_bucket", labels + (("le", "+Inf"),), cumulative))
+        samples.append((f"{self.name}_sum", labels, total))
+        samples.append((f"{self.name}_count", labels, cumulative))
+        return samples
+
+
+class Registry:
+    def __init__(self):
+        self.metrics: dict[str, Counter | Gauge | Histogram] = {}
+
+    def counter(self, name: str, description: str, labelnames: tuple[str, ...] = ()) -> Counter:
+        return self._register(Counter(name, description, labelnames))
+
+    def gauge(
+        self,
+        name: str,
+        description: str,
+        callback: Optional[Callable[[], float]] = None,
+        labelnames: tuple[str, ...] = (),
+        multiprocess_mode: str = "sum",
+    ) -> Gauge:
+        return self._register(Gauge(name, description, callback, labelnames, multiprocess_mode))
+
+    def histogram(
+        self,
+        name: str,
+        description: str,
+        buckets: tuple[float, ...] = Histogram.DEFAULT_BUCKETS,
+        labelnames: tuple[str, ...] = (),
+    ) -> Histogram:
+        return self._register(Histogram(name, description, buckets, labelnames))
+
+    def _register(self, metric):
+        if metric.name in self.metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self.metrics[metric.name] = metric
+        return metric
+
+    def snapshot(self) -> dict:
+        """JSON-serializable state of every metric in this process."""
+        return {
+            "pid": os.getpid(),
+            "metrics": {
+                metric.name: {
+                    "type": metric.type,
+                    "help": metric.description,
+                    "mode": getattr(metric, "multiprocess_mode", "sum"),
+                    "samples": [[name, list(map(list, labels)), value] for name, labels, value in metric.samples()],
+                }
+                for metric in self.metrics.values()
+            },
+        }
+
+    def render(self) -> str:
+        """Prometheus text exposition format (version 0.0.4), this process only."""
+        return render_snapshots([self.snapshot()], live_pids={os.getpid()})
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def merge_snapshots(snapshots: Iterable[dict], live_pids: set[int]) -> dict[str, dict]:
+    """Combine per-process snapshots: counters and histograms are summed (a dead
+    worker's counts still happened); gauges are summed or maxed across the live
+    workers only."""
+    merged: dict[str, dict] = {}
+    for snapshot in snapshots:
+        alive = snapshot.get("pid") in live_pids
+        for name, metric in snapshot["metrics"].items():
+            target = merged.setdefault(
+                name,
+                {"type": metric["type"], "help": metric["help"], "samples": {}},
+            )
+            if metric["type"] == "gauge" and not alive:
+                continue
+            samples = target["samples"]
+            for sample_name, labels, value in metric["samples"]:
+                key = (sample_name, tuple(tuple(pair) for pair in labels))
+                if key not in samples:
+                    samples[key] = value
+                elif metric["type"] == "gauge" and metric["mode"] == "max":
+                    samples[key] = max(samples[key], value)
+                else:
+                    samples[key] += value
+    return merged
+
+
+def render_snapshots(snapshots: Iterable[dict], live_pids: set[int]) -> str:
+    lines: list[str] = []
+    for name, metric in merge_snapshots(snapshots, live_pids).items():
+        lines.append(f"# HELP {name} {metric['help']}")
+        lines.append(f"# TYPE {name} {metric['type']}")
+        for (sample_name, labels), value in metric["samples"].items():
+            if labels:
+                rendered = ",".join(f'{key}="{_escape(str(val))}"' for key, val in labels)
+                lines.append(f"{sample_name}{{{rendered}}} {value}")
+            else:
+                lines.append(f"{sample_name} {value}")
+    return "\n".join(lines) + "\n"
+
+
+def dump_snapshot(snapshot: dict, directory: str) -> None:
+    """Atomically replace this process's snapshot file in `directory`."""
+    path = os.path.join(directory, f"{snapshot['pid']}.json")
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(snapshot, f)
+    os.replace(tmp_path, path)
+
+
+def load_snapshots(directory: str) -> list[dict]:
+    snapshots = []
+    for entry in os.listdir(directory):
+        if not entry.endswith(".json"):
+            continue
+        try:
+            with open(os.path.join(directory, entry)) as f:
+                snapshots.append(json.load(f))
+        except (OSError, ValueError):
+            # Being replaced or half-written by an older process; the next scrape gets it
+            continue
+    return snapshots
+
+
+def pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+# Singleton registry shared across the app
+registry = Registry()
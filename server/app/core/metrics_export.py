@@ -0,0 +1,73 @@
+import asyncio
+import logging
+import os
+from typing import Optional
+
+from app.core.config import settings
+from app.core.metrics import dump_snapshot, load_snapshots, pid_alive, registry, render_snapshots
+
+logger = logging.getLogger(__name__)
+
+
+class MetricsExporter:
+    """Serves /metrics for all workers on this host.
+
+    Each worker process has its own registry. With `directory` set (METRICS_DIR),
+    every worker writes a snapshot of its registry to `<directory>/<pid>.json`
+    every `interval` seconds and on shutdown. A scrape, served by whichever
+    worker gets it, merges all the files. Recording stays in memory: only the
+    periodic dump touches the disk. Snapshots from earlier deployments are
+    summed too (their counts happened), so clear the directory on deploy.
+    """
+
+    def __init__(self, directory: str, interval: float):
+        self.directory = directory
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        if not self.directory:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        self._task = asyncio.create_task(self._run(), name="metrics-exporter")
+
+    async def stop(self) -> None:
+        if not self._task:
+            return
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+        await self._dump()
+
+    async def render(self) -> str:
+        if not self.directory:
+            return registry.render()
+        own = registry.snapshot()
+        await asyncio.to_thread(dump_snapshot, own, self.directory)
+        snapshots = [own] + [
+            snapshot
+            for snapshot in await asyncio.to_thread(load_snapshots, self.directory)
+            if snapshot.get("pid") != own["pid"]
+        ]
+        live_pids = {snapshot["pid"] for snapshot in snapshots if pid_alive(snapshot["pid"])}
+        return render_snapshots(snapshots, live_pids)
+
+    async def _dump(self) -> None:
+        # Each metric's samples are copied under its own lock (see metrics._Metric)
+        snapshot = registry.snapshot()
+        await asyncio.to_thread(dump_snapshot, snapshot, self.directory)
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self._dump()
+            except OSError:
+                logger.exception("Could not write metrics snapshot to %s", self.directory)
+
+
+# Singleton instance shared across the app
+metrics_exporter = MetricsExporter(
+    directory=settings.METRICS_DIR,
+    interval=settings.METRICS_FLUSH_INTERVAL_SECONDS,
+)
@@ -0,0 +1,46 @@
+import base64
+from datetime import datetime
+from typing import Optional, Sequence, TypeVar
+import uuid
+
+from sqlalchemy import Select, tuple_
+
+from app.core.exceptions import InvalidInputException
+
+RowT = TypeVar("RowT")
+
+
+def encode_cursor(created_at: datetime, row_id: uuid.UUID) -> str:
+    """Opaque keyset cursor for rows ordered by (created_at, id)."""
+    raw = f"{created_at.isoformat()}|{row_id}"
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, uuid.UUID]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, row_id = base64.urlsafe_b64decode(padded).decode("utf-8").split("|")
+        return datetime.fromisoformat(created_at), uuid.UUID(row_id)
+    except ValueError:
+        raise InvalidInputException("malformed cursor")
+
+
+def keyset(query: Select, created_at, row_id, after: Optional[tuple[datetime, uuid.UUID]], limit: int) -> Select:
+    """Order `query` by (created_at, id) and start it after the `after` key.
+
+    It fetches `limit + 1` rows, so `page()` can tell whether another page
+    follows. With a (created_at, id) index, every page costs the same however
+    deep it is."""
+    query = query.order_by(created_at, row_id).limit(limit + 1)
+    if after:
+        query = query.where(tuple_(created_at, row_id) > tuple_(*after))
+    return query
+
+
+def page(rows: Sequence[RowT], limit: int) -> tuple[Sequence[RowT], Optional[str]]:
+    """Split the `limit + 1` rows of a `keyset()` query into the page and the
+    cursor of the next one. The cursor is None on the last page."""
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor(rows[-1].created_at, rows[-1].id)
@@ -0,0 +1,193 @@
+import argparse
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import replace
+import statistics
+import time
+from typing import Callable, TypeVar
+
+from argon2 import Parameters, PasswordHasher, extract_parameters, profiles
+from argon2.exceptions import InvalidHashError, VerifyMismatchError
+
+from app.core.config import settings
+from app.core.exceptions import PasswordHashingBusyException
+from app.core.metrics import registry
+
+T = TypeVar("T")
+
+# OWASP's floor for argon2id; calibration never goes below it, even past the target
+MIN_TIME_COST = 2
+MIN_MEMORY_KIB = 19 * 1024
+CALIBRATION_SAMPLES = 3
+
+HASH_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+hash_seconds = registry.histogram(
+    "password_hash_seconds",
+    "argon2 run time, excluding the wait for a worker",
+    buckets=HASH_BUCKETS,
+    labelnames=("operation",),
+)
+hash_wait_seconds = registry.histogram(
+    "password_hash_wait_seconds",
+    "Time a password operation waited for a hashing worker",
+    buckets=HASH_BUCKETS,
+)
+hash_rejected = registry.counter(
+    "password_hash_rejected_total",
+    "Password operations refused with 503 because the hashing queue was full",
+)
+password_rehashed = registry.counter(
+    "password_rehashed_total",
+    "Stored hashes upgraded to the current argon2 parameters after a login",
+)
+
+
+def _hash_seconds(parameters: Parameters) -> float:
+    hasher = PasswordHasher.from_parameters(parameters)
+    samples = []
+    for _ in range(CALIBRATION_SAMPLES):
+        start = time.perf_counter()
+        hasher.hash("calibration")
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+
+def calibrate(target_seconds: float, max_memory_kib: int, base: Parameters = profiles.RFC_9106_LOW_MEMORY) -> Parameters:
+    """Costliest argon2 parameters that hash within `target_seconds` on this machine.
+
+    Memory comes first: it is halved from `max_memory_kib` until two passes fit
+    the target. Then passes are added while they still fit. Timings are noisy,
+    so this runs offline and its result is pinned in settings (see `main`).
+    """
+    memory_kib = max(max_memory_kib, MIN_MEMORY_KIB)
+    per_pass = _hash_seconds(replace(base, time_cost=1, memory_cost=memory_kib))
+    while per_pass * MIN_TIME_COST > target_seconds and memory_kib > MIN_MEMORY_KIB:
+        memory_kib = max(memory_kib // 2, MIN_MEMORY_KIB)
+        per_pass = _hash_seconds(replace(base, time_cost=1, memory_cost=memory_kib))
+
+    # A pass costs roughly the same each time, so this starts at or just under the target
+    parameters = replace(base, time_cost=max(int(target_seconds / per_pass), MIN_TIME_COST), memory_cost=memory_kib)
+    while parameters.time_cost > MIN_TIME_COST and _hash_seconds(parameters) > target_seconds:
+        parameters = replace(parameters, time_cost=parameters.time_cost - 1)
+    return parameters
+
+
+def configured_parameters() -> Parameters:
+    return replace(
+        profiles.RFC_9106_LOW_MEMORY,
+        time_cost=settings.PASSWORD_HASH_TIME_COST,
+        memory_cost=settings.PASSWORD_HASH_MEMORY_KIB,
+    )
+
+
+class PasswordHashingPool:
+    """Runs argon2 on its own small thread pool, away from the event loop and the
+    AnyIO threadpool that serves sync routes.
+
+    argon2-cffi releases the GIL while hashing, so `workers` threads use up to
+    `workers` cores. Up to `queue_max` more operations wait for a thread.
+    Anything beyond that fails fast with PasswordHashingBusyException (503),
+    instead of piling up behind a signup or login burst.
+    """
+
+    def __init__(self, hasher: PasswordHasher, workers: int, queue_max: int):
+        self.hasher = hasher
+        self.workers = workers
+        self.queue_max = queue_max
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="argon2")
+        self._waiting = 0
+        self._running = 0
+        registry.gauge(
+            "password_hash_queue_depth",
+            "Password operations waiting for a hashing worker",
+            callback=lambda: self._waiting,
+        )
+        registry.gauge("password_hash_running", "Password operations being hashed", callback=lambda: self._running)
+        registry.gauge("password_hash_time_cost", "argon2 passes for new hashes", callback=lambda: self.hasher.time_cost)
+        registry.gauge(
+            "password_hash_memory_kib",
+            "argon2 memory for new hashes, in KiB",
+            callback=lambda: self.hasher.memory_cost,
+        )
+
+    def needs_rehash(self, hashed_password: str) -> bool:
+        """Whether a stored hash is weaker than new ones: fewer passes or less memory.
+        Never true for a stronger hash, so lowering the costs does not downgrade
+        stored hashes. Cheap: only parses the hash."""
+        try:
+            stored = extract_parameters(hashed_password)
+        except InvalidHashError:
+            return False
+        return stored.time_cost < self.hasher.time_cost or stored.memory_cost < self.hasher.memory_cost
+
+    async def hash(self, password: str) -> str:
+        return await self._submit("hash", self.hasher.hash, password)
+
+    async def verify(self, hashed_password: str, password: str) -> bool:
+        return await self._submit("verify", self._verify, hashed_password, password)
+
+    def _verify(self, hashed_password: str, password: str) -> bool:
+        try:
+            return self.hasher.verify(hashed_password, password)
+        except VerifyMismatchError:
+            return False
+
+    async def _submit(self, operation: str, fn: Callable[..., T], *args) -> T:
+        if self._waiting + self._running >= self.workers + self.queue_max:
+            hash_rejected.inc()
+            raise PasswordHashingBusyException()
+        self._waiting += 1
+        submitted = time.perf_counter()
+        loop = asyncio.get_running_loop()
+
+        def run() -> T:
+            # On the worker thread: counters and metrics are only updated from the loop
+            started = time.perf_counter()
+            loop.call_soon_threadsafe(self._started, started - submitted)
+            try:
+                return fn(*args)
+            finally:
+                loop.call_soon_threadsafe(hash_seconds.labels(operation).observe, time.perf_counter() - started)
+
+        future = loop.run_in_executor(self._executor, run)
+        try:
+            return await asyncio.shield(future)
+        finally:
+            if not future.done():
+                # Caller went away; the worker still finishes the hash, so keep counting it
+                future.add_done_callback(lambda _: self._finished())
+            else:
+                self._finished()
+
+    def _started(self, waited: float) -> None:
+        self._waiting -= 1
+        self._running += 1
+        hash_wait_seconds.observe(waited)
+
+    def _finished(self) -> None:
+        self._running -= 1
+
+
+# Singleton instance shared across the app
+password_hasher = PasswordHashingPool(
+    PasswordHasher.from_parameters(configured_parameters()),
+    workers=settings.PASSWORD_HASH_WORKERS,
+    queue_max=settings.PASSWORD_HASH_QUEUE_MAX,
+)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Calibrate argon2 costs on this machine and print them as settings.")
+    parser.add_argument("--target-ms", type=int, default=250, help="latency of one hash")
+    parser.add_argument("--max-memory-mib", type=int, default=64, help="memory of one hash, at most")
+    args = parser.parse_args()
+
+    parameters = calibrate(args.target_ms / 1000, args.max_memory_mib * 1024)
+    print(f"PASSWORD_HASH_TIME_COST={parameters.time_cost}")
+    print(f"PASSWORD_HASH_MEMORY_KIB={parameters.memory_cost}")
+    print(f"# {_hash_seconds(parameters) * 1000:.0f} ms per hash, parallelism={parameters.parallelism}")
+
+
+if __name__ == "__main__":
+    main()
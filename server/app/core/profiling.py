@@ -0,0 +1,287 @@
+import asyncio
+from collections import Counter
+from datetime import datetime
+import hashlib
+import heapq
+import hmac
+import itertools
+import os
+import random
+import sys
+import threading
+import time
+from types import FrameType
+from typing import Optional
+import uuid
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+
+SIGNATURE_HEADER = "X-Profile"
+SIGNATURE_MAX_AGE_SECONDS = 300
+# Requests to the profile download endpoints are never profiled themselves
+DEBUG_PATH_PREFIX = f"{settings.API_V1_STR}/debug"
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MAX_STACK_DEPTH = 200
+
+
+def sign_profile_request(secret: str, timestamp: Optional[int] = None) -> str:
+    """Value for the X-Profile header: `<unix timestamp>.<hex HMAC-SHA256(secret, timestamp)>`."""
+    timestamp = int(time.time()) if timestamp is None else timestamp
+    digest = hmac.new(secret.encode("utf-8"), str(timestamp).encode("utf-8"), hashlib.sha256).hexdigest()
+    return f"{timestamp}.{digest}"
+
+
+def verify_profile_signature(value: Optional[str]) -> bool:
+    if not settings.PROFILING_SECRET or not value:
+        return False
+    timestamp, _, _ = value.partition(".")
+    try:
+        issued_at = int(timestamp)
+    except ValueError:
+        return False
+    if abs(time.time() - issued_at) > SIGNATURE_MAX_AGE_SECONDS:
+        return False
+    return hmac.compare_digest(sign_profile_request(settings.PROFILING_SECRET, issued_at), value)
+
+
+def _frame_label(frame: FrameType) -> str:
+    code = frame.f_code
+    path = code.co_filename
+    if path.startswith(APP_DIR):
+        path = os.path.relpath(path, os.path.dirname(APP_DIR))
+    else:
+        path = "/".join(path.split(os.sep)[-2:])
+    return f"{code.co_name} ({path}:{code.co_firstlineno})"
+
+
+def _running_stack(top: Optional[FrameType], anchor: FrameType) -> Optional[list[FrameType]]:
+    """Frames above `anchor` if it is on this thread's stack right now, outermost first."""
+    frames: list[FrameType] = []
+    frame = top
+    while frame is not None and len(frames) < MAX_STACK_DEPTH:
+        if frame is anchor:
+            frames.reverse()
+            return frames
+        frames.append(frame)
+        frame = frame.f_back
+    return None
+
+
+def _suspended_stack(coro, anchor: FrameType) -> Optional[list[FrameType]]:
+    """Where a suspended task is waiting: its await chain below `anchor`."""
+    frames: list[FrameType] = []
+    found = False
+    awaitable = coro
+    for _ in range(MAX_STACK_DEPTH):
+        frame = getattr(awaitable, "cr_frame", None) or getattr(awaitable, "gi_frame", None)
+        if frame is None:
+            break
+        if found:
+            frames.append(frame)
+        elif frame is anchor:
+            found = True
+        awaitable = getattr(awaitable, "cr_await", None) or getattr(awaitable, "gi_yieldfrom", None)
+    return frames if found else None
+
+
+def _waiting_on_threadpool(frames: list[FrameType]) -> bool:
+    return any(f.f_code.co_name == "run_sync" and "anyio" in f.f_code.co_filename for f in frames)
+
+
+def _worker_stack(frames: dict[int, FrameType], skip: set[int]) -> list[FrameType]:
+    """Stack of a worker thread currently running app code, from its outermost app frame."""
+    for thread_id, top in frames.items():
+        if thread_id in skip:
+            continue
+        stack: list[FrameType] = []
+        frame: Optional[FrameType] = top
+        while frame is not None and len(stack) < MAX_STACK_DEPTH:
+            stack.append(frame)
+            frame = frame.f_back
+        app_frames = [i for i, f in enumerate(stack) if f.f_code.co_filename.startswith(APP_DIR)]
+        if app_frames:
+            return list(reversed(stack[: app_frames[-1] + 1]))
+    return []
+
+
+class Profile:
+    """Stack samples of one request, aggregated as collapsed stacks."""
+
+    def __init__(self, method: str, path: str, anchor: FrameType, task: asyncio.Task, loop_thread_id: int):
+        self.id = uuid.uuid4().hex[:12]
+        self.method = method
+        self.path = path
+        self.route = path
+        self.started_at = datetime.now()
+        self.duration = 0.0
+        self.samples = 0
+        self.stacks: Counter[str] = Counter()
+        self._anchor = anchor
+        self._task = task
+        self._loop_thread_id = loop_thread_id
+
+    def take(self, frames: dict[int, FrameType], sampler_thread_id: int) -> None:
+        stack = _running_stack(frames.get(self._loop_thread_id), self._anchor)
+        if stack is not None:
+            labels = [_frame_label(f) for f in stack]
+        else:
+            stack = _suspended_stack(self._task.get_coro(), self._anchor)
+            if stack is None:
+                return
+            labels = [_frame_label(f) for f in stack]
+            worker = []
+            if _waiting_on_threadpool(stack):
+                worker = _worker_stack(frames, {self._loop_thread_id, sampler_thread_id})
+            if worker:
+                labels += [_frame_label(f) for f in worker]
+            else:
+                labels.append("(awaiting)")
+        self.stacks[";".join(labels)] += 1
+        self.samples += 1
+
+    def folded(self) -> str:
+        """Brendan Gregg's collapsed-stack format: flamegraph.pl, speedscope, inferno."""
+        root = f"{self.method} {self.route}".replace(";", ",")
+        lines = []
+        for stack, count in self.stacks.items():
+            lines.append(f"{root};{stack} {count}" if stack else f"{root} {count}")
+        return "\n".join(lines) + "\n"
+
+
+class Profiler:
+    """Samples the stacks of selected requests and keeps the slowest profiles.
+
+    One daemon thread reads `sys._current_frames()` every `interval` seconds
+    while any request is being profiled, and sleeps otherwise. A sample is
+    attributed to a request in one of three ways:
+    - the request's middleware frame is on the event-loop thread's stack, so it
+      is running
+    - it is suspended, and its await chain shows where
+    - it is waiting on the threadpool, and a worker thread is running app code.
+      With several threadpool requests in flight, this sample can land on the
+      wrong one.
+
+    The `keep` slowest finished profiles are retained. At most `max_active`
+    requests are profiled at once, which bounds the overhead.
+    """
+
+    def __init__(self, interval: float, keep: int, max_active: int):
+        self.interval = interval
+        self.keep = keep
+        self.max_active = max_active
+        self._active: dict[str, Profile] = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._slowest: list[tuple[float, int, Profile]] = []
+        self._sequence = itertools.count()
+
+    def begin(self, scope: Scope, anchor: FrameType) -> Optional[Profile]:
+        task = asyncio.current_task()
+        if task is None:
+            return None
+        profile = Profile(scope["method"], scope["path"], anchor, task, threading.get_ident())
+        with self._lock:
+            if len(self._active) >= self.max_active:
+                return None
+            self._active[profile.id] = profile
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+                self._thread.start()
+        self._wake.set()
+        return profile
+
+    def finish(self, profile: Profile, duration: float, route: Optional[str]) -> None:
+        with self._lock:
+            self._active.pop(profile.id, None)
+        profile.duration = duration
+        profile.route = route or profile.path
+        entry = (duration, next(self._sequence), profile)
+        if len(self._slowest) < self.keep:
+            heapq.heappush(self._slowest, entry)
+        elif duration > self._slowest[0][0]:
+            heapq.heapreplace(self._slowest, entry)
+
+    def profiles(self) -> list[Profile]:
+        return [profile for _, _, profile in sorted(self._slowest, reverse=True)]
+
+    def get(self, profile_id: str) -> Optional[Profile]:
+        return next((profile for _, _, profile in self._slowest if profile.id == profile_id), None)
+
+    def _run(self) -> None:
+        me = threading.get_ident()
+        while True:
+            with self._lock:
+                idle = not self._active
+            if idle:
+                self._wake.wait()
+                self._wake.clear()
+                continue
+            frames = sys._current_frames()
+            # Sample under the lock: finish() pops the profile under it too, so
+            # once it returns no further sample can land in a profile being read
+            with self._lock:
+                for profile in self._active.values():
+                    try:
+                        profile.take(frames, me)
+                    except Exception:
+                        # Frames change under us while the loop keeps running; drop the sample
+                        pass
+            del frames
+            time.sleep(self.interval)
+
+
+class ProfilingMiddleware:
+    """Profiles requests that carry a valid `X-Profile` signature, plus a random
+    `PROFILING_SAMPLE_RATE` fraction of all requests. Profiled responses get
+    an `X-Profile-Id` header. The profile is kept only if it ranks among the
+    `PROFILING_KEEP` slowest."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not self._wanted(scope):
+            await self.app(scope, receive, send)
+            return
+
+        profile = profiler.begin(scope, sys._getframe())
+        if profile is None:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_id(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message).append("X-Profile-Id", profile.id)
+            await send(message)
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            route = getattr(scope.get("route"), "path_format", None)
+            profiler.finish(profile, time.perf_counter() - started, route)
+
+    @staticmethod
+    def _wanted(scope: Scope) -> bool:
+        if scope["path"].startswith(DEBUG_PATH_PREFIX):
+            return False
+        if random.random() < settings.PROFILING_SAMPLE_RATE:
+            return True
+        header = SIGNATURE_HEADER.lower().encode("latin-1")
+        for name, value in scope["headers"]:
+            if name == header:
+                return verify_profile_signature(value.decode("latin-1"))
+        return False
+
+
+# Singleton instance shared across the app
+profiler = Profiler(
+    interval=settings.PROFILING_INTERVAL_MS / 1000,
+    keep=settings.PROFILING_KEEP,
+    max_active=settings.PROFILING_MAX_ACTIVE,
+)
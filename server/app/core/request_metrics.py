@@ -0,0 +1,54 @@
+import time
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.metrics import registry
+
+request_duration = registry.histogram(
+    "http_request_duration_seconds",
+    "Time from request start to the end of the response, by route template",
+    labelnames=("method", "route"),
+)
+responses_total = registry.counter(
+    "http_responses_total",
+    "Responses by route template and status code",
+    labelnames=("method", "route", "status"),
+)
+
+# Label for requests that matched no route, so unknown paths can't blow up cardinality
+UNMATCHED_ROUTE = "unmatched"
+
+
+class RequestMetricsMiddleware:
+    """Pure ASGI middleware recording per-route latency and status counts.
+
+    Routes are labelled by their template (`/api/v1/session/{session_id}`),
+    which the router leaves in `scope["route"]`. Streaming responses (SSE,
+    long-poll) are timed until their last byte. WebSockets are not recorded.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status_code = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            route = scope.get("route")
+            template = getattr(route, "path_format", None) or UNMATCHED_ROUTE
+            method = scope["method"]
+            request_duration.labels(method, template).observe(time.perf_counter() - started)
+            responses_total.labels(method, template, str(status_code)).inc()
@@ -0,0 +1,83 @@
+from dataclasses import dataclass
+from datetime import datetime
+import time
+from typing import Optional
+import uuid
+
+from app.core.config import settings
+from app.core.metrics import registry
+from app.models.ctv_session import SessionStatus
+
+session_cache_hits = registry.counter("session_state_cache_hits_total", "Interactions served from the session-state cache")
+session_cache_misses = registry.counter("session_state_cache_misses_total", "Interactions that had to read the session row")
+
+
+@dataclass(frozen=True)
+class CachedSessionState:
+    campaign_id: uuid.UUID
+    status: SessionStatus
+    expires_at: Optional[datetime]
+
+
+class SessionStateCache:
+    """TTL cache of CTV session state keyed by session id.
+
+    Only paired sessions are cached. That state is left only by expiry, which the
+    TTL (capped at `expires_at`) already covers, so an entry can never go stale
+    even when another worker handled the transition. Waiting sessions are
+    always read from the database.
+    """
+
+    def __init__(self, max_ttl: float, max_entries: int):
+        self.max_ttl = max_ttl
+        self.max_entries = max_entries
+        self._entries: dict[uuid.UUID, tuple[float, CachedSessionState]] = {}
+
+    def get(self, session_id: uuid.UUID) -> Optional[CachedSessionState]:
+        entry = self._entries.get(session_id)
+        if entry is None:
+            session_cache_misses.inc()
+            return None
+        deadline, state = entry
+        if time.monotonic() >= deadline:
+            self._entries.pop(session_id, None)
+            session_cache_misses.inc()
+            return None
+        session_cache_hits.inc()
+        return state
+
+    def put(
+        self,
+        session_id: uuid.UUID,
+        campaign_id: uuid.UUID,
+        status: SessionStatus,
+        expires_at: Optional[datetime],
+    ) -> None:
+        if status != SessionStatus.paired:
+            return
+        ttl = self.max_ttl
+        if expires_at:
+            ttl = min(ttl, (expires_at - datetime.now()).total_seconds())
+        if ttl <= 0:
+            return
+        if len(self._entries) >= self.max_entries:
+            # dicts keep insertion order: drop the oldest entry
+            self._entries.pop(next(iter(self._entries)), None)
+        self._entries[session_id] = (
+            time.monotonic() + ttl,
+            CachedSessionState(campaign_id=campaign_id, status=status, expires_at=expires_at),
+        )
+
+    def invalidate(self, session_id: uuid.UUID) -> None:
+        self._entries.pop(session_id, None)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+# Singleton instance shared across the app
+session_state_cache = SessionStateCache(
+    max_ttl=settings.SESSION_STATE_CACHE_TTL_SECONDS,
+    max_entries=settings.SESSION_STATE_CACHE_MAX_ENTRIES,
+)
+registry.gauge("session_state_cache_entries", "Sessions currently cached", callback=lambda: len(session_state_cache))
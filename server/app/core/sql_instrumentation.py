@@ -0,0 +1,134 @@
+from collections import Counter
+from contextvars import ContextVar
+import logging
+import random
+import time
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.metrics import registry
+from app.core.request_metrics import UNMATCHED_ROUTE
+
+logger = logging.getLogger(__name__)
+
+queries_per_request = registry.histogram(
+    "sql_queries_per_request",
+    "SQL statements executed per sampled request",
+    buckets=(1, 2, 3, 5, 8, 13, 21, 34, 55, 100),
+    labelnames=("route",),
+)
+sql_seconds_per_request = registry.histogram(
+    "sql_seconds_per_request",
+    "Time spent in SQL statements per sampled request",
+    labelnames=("route",),
+)
+slow_queries = registry.counter("sql_slow_queries_total", "Statements slower than SQL_SLOW_QUERY_MS", labelnames=("route",))
+repeated_statements = registry.counter(
+    "sql_repeated_statement_requests_total",
+    "Sampled requests that ran one statement SQL_REPEATED_STATEMENT_THRESHOLD times or more (likely N+1)",
+    labelnames=("route",),
+)
+
+
+class QueryStats:
+    """SQL statements run on behalf of one request."""
+
+    def __init__(self, scope: Scope):
+        self.scope = scope
+        self.count = 0
+        self.seconds = 0.0
+        self.statements: Counter[str] = Counter()
+
+    @property
+    def route(self) -> str:
+        # Resolved lazily: the router fills scope["route"] after this object is created.
+        # Never the raw path: scanners hitting random URLs would add a label per URL
+        route = self.scope.get("route")
+        return getattr(route, "path_format", None) or UNMATCHED_ROUTE
+
+
+_current: ContextVar[Optional[QueryStats]] = ContextVar("sql_query_stats", default=None)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current.get() is not None:
+        conn.info.setdefault("query_started_at", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current.get()
+    if stats is None:
+        return
+    started = conn.info.get("query_started_at")
+    if not started:
+        return
+    elapsed = time.perf_counter() - started.pop()
+    stats.count += 1
+    stats.seconds += elapsed
+    # Parameters are bound separately, so an N+1 loop repeats the exact same text
+    stats.statements[statement] += 1
+    if elapsed * 1000 >= settings.SQL_SLOW_QUERY_MS:
+        slow_queries.labels(stats.route).inc()
+        logger.warning("Slow query (%.1f ms) on %s: %s", elapsed * 1000, stats.route, statement)
+
+
+def instrument_engine(engine: Engine) -> None:
+    """Attach the per-request statement hooks to a (sync) engine. For an
+    AsyncEngine pass `async_engine.sync_engine`."""
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+class SQLInstrumentationMiddleware:
+    """Counts and times the SQL each sampled request runs.
+
+    A fraction `SQL_INSTRUMENTATION_SAMPLE_RATE` of HTTP requests gets a
+    `QueryStats` in a context variable, which the engine hooks fill in. Other
+    requests pay one random() call. On sampled requests:
+    - statements slower than `SQL_SLOW_QUERY_MS` are logged with the route
+    - a statement repeated `SQL_REPEATED_STATEMENT_THRESHOLD` times is flagged
+      as a likely N+1
+    - with `SQL_TIMING_HEADERS`, the response carries `X-DB-Queries` and a
+      `Server-Timing: db` entry (counted up to the moment headers are sent)
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or random.random() >= settings.SQL_INSTRUMENTATION_SAMPLE_RATE:
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats(scope)
+        token = _current.set(stats)
+
+        async def send_with_headers(message: Message) -> None:
+            if message["type"] == "http.response.start" and settings.SQL_TIMING_HEADERS:
+                headers = MutableHeaders(scope=message)
+                headers.append("X-DB-Queries", str(stats.count))
+                headers.append("Server-Timing", f'db;dur={stats.seconds * 1000:.1f};desc="{stats.count} queries"')
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_headers)
+        finally:
+            _current.reset(token)
+            self._report(stats)
+
+    @staticmethod
+    def _report(stats: QueryStats) -> None:
+        route = stats.route
+        queries_per_request.labels(route).observe(stats.count)
+        sql_seconds_per_request.labels(route).observe(stats.seconds)
+        if not stats.statements:
+            return
+        statement, repeats = stats.statements.most_common(1)[0]
+        if repeats >= settings.SQL_REPEATED_STATEMENT_THRESHOLD:
+            repeated_statements.labels(route).inc()
+            logger.warning("Statement ran %d times in one request on %s (N+1?): %s", repeats, route, statement)
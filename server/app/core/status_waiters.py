@@ -0,0 +1,60 @@
+import asyncio
+from typing import Optional
+
+from app.core.config import settings
+from app.core.metrics import registry
+from app.core.ws_manager import ws_manager
+from app.models.ctv_session import SessionStatus
+
+long_poll_rejected = registry.counter(
+    "session_long_poll_rejected_total", "Long-poll requests answered immediately because the waiter limit was reached"
+)
+
+
+class StatusWaiters:
+    """In-process futures parked by long-poll requests, keyed by session id.
+
+    Woken by status events delivered through `ws_manager` (so a claim handled by
+    another worker still wakes them when a cross-process broker is configured).
+    A waiter holds no DB connection; the number of waiters is capped at
+    `max_waiters`, beyond which `register` returns None and the caller should
+    answer immediately.
+    """
+
+    def __init__(self, max_waiters: int):
+        self.max_waiters = max_waiters
+        self._waiters: dict[str, set[asyncio.Future]] = {}
+        self.count = 0
+
+    def register(self, session_id: str) -> Optional[asyncio.Future]:
+        if self.count >= self.max_waiters:
+            long_poll_rejected.inc()
+            return None
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.setdefault(session_id, set()).add(future)
+        self.count += 1
+        return future
+
+    def unregister(self, session_id: str, future: asyncio.Future) -> None:
+        waiters = self._waiters.get(session_id)
+        if waiters is None or future not in waiters:
+            return
+        waiters.discard(future)
+        self.count -= 1
+        if not waiters:
+            del self._waiters[session_id]
+
+    def notify(self, session_id: str, status: SessionStatus) -> None:
+        for future in self._waiters.get(session_id, ()):
+            if not future.done():
+                future.set_result(status)
+
+    def on_event(self, session_id: str, message: dict) -> None:
+        if message.get("event") == "paired":
+            self.notify(session_id, SessionStatus.paired)
+
+
+# Singleton instance shared across the app
+status_waiters = StatusWaiters(max_waiters=settings.LONG_POLL_MAX_WAITERS)
+ws_manager.add_listener(status_waiters.on_event)
+registry.gauge("session_long_poll_waiters", "Long-poll requests currently parked", callback=lambda: status_waiters.count)
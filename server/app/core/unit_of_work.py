@@ -0,0 +1,69 @@
+import inspect
+from typing import Awaitable, Callable, Optional, Union
+
+from fastapi import Request, Response
+from fastapi.routing import APIRoute
+from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
+from starlette.concurrency import run_in_threadpool
+
+AFTER_COMMIT_KEY = "after_commit"
+
+AfterCommitCallback = Callable[[], Optional[Awaitable[object]]]
+
+
+def bind(request: Request, session: Union[Session, AsyncSession]) -> None:
+    """Enlist a request's DB session in its unit of work (see UnitOfWorkRoute)."""
+    session.info[AFTER_COMMIT_KEY] = []
+    request.state.db_sessions = [*getattr(request.state, "db_sessions", []), session]
+
+
+async def after_commit(session: Union[Session, AsyncSession], callback: AfterCommitCallback) -> None:
+    """Run `callback` once the unit of work `session` belongs to has committed, so
+    nobody is notified of a write that is then rolled back, and no cache entry or
+    metric records it. Sessions outside a unit of work (WebSocket handlers,
+    background tasks) run it right away. `callback` may be sync or async."""
+    pending = session.info.get(AFTER_COMMIT_KEY)
+    if pending is None:
+        await _run(callback)
+    else:
+        pending.append(callback)
+
+
+async def _run(callback: AfterCommitCallback) -> None:
+    result = callback()
+    if inspect.isawaitable(result):
+        await result
+
+
+async def commit(request: Request) -> None:
+    sessions = getattr(request.state, "db_sessions", [])
+    for session in sessions:
+        if isinstance(session, AsyncSession):
+            await session.commit()
+        else:
+            await run_in_threadpool(session.commit)
+    for session in sessions:
+        for callback in session.info.pop(AFTER_COMMIT_KEY, []):
+            await _run(callback)
+
+
+class UnitOfWorkRoute(APIRoute):
+    """One transaction per request.
+
+    CRUD functions only flush. The request's session is committed once, after
+    the endpoint returns and before the response is sent, so a client never
+    sees a success for a write that did not commit. When the endpoint raises
+    (an AppException or anything else), `get_session`/`get_async_session`
+    roll back instead, and the after-commit callbacks are dropped.
+    """
+
+    def get_route_handler(self) -> Callable[[Request], Awaitable[Response]]:
+        handler = super().get_route_handler()
+
+        async def unit_of_work_handler(request: Request) -> Response:
+            response = await handler(request)
+            await commit(request)
+            return response
+
+        return unit_of_work_handler
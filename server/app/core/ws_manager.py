@@ -1,35 +1,145 @@
+import asyncio
+import logging
+import time
+from typing import Callable, Optional
+
 from fastapi import WebSocket
 
+from app.core.broker import Broker, InMemoryBroker, create_broker
+from app.core.config import settings
+from app.core.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+# Close code sent to a CTV whose send queue overflowed (4xxx = application defined)
+SLOW_CONSUMER_CLOSE_CODE = 4008
+
+ws_send_latency = registry.histogram(
+    "ws_send_latency_seconds",
+    "Time from queueing a message on a CTV socket to the frame being written",
+)
+
+
+class _Connection:
+    """One CTV socket with its own bounded outbound queue and writer task."""
+
+    def __init__(self, websocket: WebSocket, max_queue: int):
+        self.websocket = websocket
+        # (message, monotonic time it was queued)
+        self.queue: asyncio.Queue[tuple[dict, float]] = asyncio.Queue(maxsize=max_queue)
+        self.writer: Optional[asyncio.Task] = None
+
 
 class ConnectionManager:
     """Manages active WebSocket connections indexed by session_id.
 
-    For MVP this is an in-memory dict (single server instance).
-    For horizontal scaling, back this with Redis Pub/Sub.
+    Sockets live in a per-process dict; `send_to_session` goes through a
+    pluggable `Broker` so an event published on any worker reaches the worker
+    holding the CTV socket. The in-memory broker (default) covers a single
+    process; `WS_BROKER=postgres` fans out over LISTEN/NOTIFY.
+
+    Sending never awaits the socket: messages are put on the connection's
+    bounded queue and written by a per-connection task, so a slow TV cannot
+    stall the request that produced the event. When a queue is full the
+    consumer is considered too slow and is dropped (closed with 4008); the CTV
+    is expected to reconnect and catch up from the interaction table.
     """
 
-    def __init__(self):
-        self.active_connections: dict[str, WebSocket] = {}
+    def __init__(self, max_queue: int = 256, broker: Optional[Broker] = None):
+        self.max_queue = max_queue
+        self.broker = broker or InMemoryBroker()
+        self.active_connections: dict[str, _Connection] = {}
+        self.listeners: list[Callable[[str, dict], None]] = []
+        self._closing: set[asyncio.Task] = set()
+
+    async def start(self) -> None:
+        await self.broker.start(self.deliver)
+
+    async def stop(self) -> None:
+        await self.broker.stop()
+
+    def add_listener(self, listener: Callable[[str, dict], None]) -> None:
+        """Also hand every event delivered to this process to `listener` (in-process
+        consumers such as long-poll waiters), whether or not a socket is attached."""
+        self.listeners.append(listener)
 
     async def connect(self, session_id: str, websocket: WebSocket):
         await websocket.accept()
-        self.active_connections[session_id] = websocket
+        previous = self.active_connections.get(session_id)
+        if previous:
+            self._drop(session_id, previous, code=1000, reason="Replaced by a new connection")
+        connection = _Connection(websocket, self.max_queue)
+        connection.writer = asyncio.create_task(self._write_loop(session_id, connection))
+        self.active_connections[session_id] = connection
 
-    def disconnect(self, session_id: str):
+    def disconnect(self, session_id: str, websocket: Optional[WebSocket] = None):
+        connection = self.active_connections.get(session_id)
+        if connection is None:
+            return
+        # A replaced socket must not unregister the connection that replaced it
+        if websocket is not None and connection.websocket is not websocket:
+            return
         self.active_connections.pop(session_id, None)
+        if connection.writer:
+            connection.writer.cancel()
 
     async def send_to_session(self, session_id: str, message: dict) -> bool:
         """Push a JSON message to the CTV connected for this session.
-        Returns True if the message was sent, False if no active connection."""
-        websocket = self.active_connections.get(session_id)
-        if websocket:
-            await websocket.send_json(message)
-            return True
-        return False
+        Returns True if the message was queued on a socket in this process; with
+        a cross-process broker it may still be delivered by another worker."""
+        return await self.broker.publish(session_id, message)
+
+    def deliver(self, session_id: str, message: dict) -> bool:
+        """Hand a published event to local listeners and this process's socket for the session."""
+        for listener in self.listeners:
+            listener(session_id, message)
+        return self.enqueue(session_id, message)
+
+    def enqueue(self, session_id: str, message: dict) -> bool:
+        """Queue a message on this process's socket for the session, without awaiting."""
+        connection = self.active_connections.get(session_id)
+        if not connection:
+            return False
+        try:
+            connection.queue.put_nowait((message, time.monotonic()))
+        except asyncio.QueueFull:
+            logger.warning("Dropping slow CTV consumer for session %s", session_id)
+            self._drop(session_id, connection, code=SLOW_CONSUMER_CLOSE_CODE, reason="Slow consumer")
+            return False
+        return True
 
     def is_connected(self, session_id: str) -> bool:
         return session_id in self.active_connections
 
+    async def _write_loop(self, session_id: str, connection: _Connection) -> None:
+        try:
+            while True:
+                message, queued_at = await connection.queue.get()
+                await connection.websocket.send_json(message)
+                ws_send_latency.observe(time.monotonic() - queued_at)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            # Socket went away mid-send; the receive loop will see the disconnect too
+            self.disconnect(session_id, connection.websocket)
+
+    def _drop(self, session_id: str, connection: _Connection, code: int, reason: str) -> None:
+        self.disconnect(session_id, connection.websocket)
+        task = asyncio.create_task(self._close(connection.websocket, code, reason))
+        self._closing.add(task)
+        task.add_done_callback(self._closing.discard)
+
+    @staticmethod
+    async def _close(websocket: WebSocket, code: int, reason: str) -> None:
+        try:
+            await websocket.close(code=code, reason=reason)
+        except Exception:
+            pass
+
 
 # Singleton instance shared across the app
-ws_manager = ConnectionManager()
+ws_manager = ConnectionManager(
+    max_queue=settings.WS_SEND_QUEUE_MAX,
+    broker=create_broker(settings.WS_BROKER, settings.DATABASE_URL),
+)
+registry.gauge("ws_connections_open", "CTV WebSocket connections held by this process", callback=lambda: len(ws_manager.active_connections))
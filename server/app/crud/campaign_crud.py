@@ -1,11 +1,29 @@
-from typing import List, Optional
+from datetime import datetime
+from typing import AsyncIterator, List, Optional, Sequence
 import uuid
 
+from sqlalchemy import Row
 from sqlmodel import Session, select
-from app.models import Campaign
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.core.campaign_cache import CampaignSnapshot, campaign_cache
+from app.core.pagination import keyset
+from app.db import async_engine
+from app.models import Campaign, CTVSession, Interaction
 from app.models.campaign import CampaignCreate
 
 
+# CampaignResponse fields, selected as plain rows by the list endpoint
+CAMPAIGN_RESPONSE_COLUMNS = (
+    Campaign.id,
+    Campaign.name,
+    Campaign.description,
+    Campaign.interaction_config,
+    Campaign.qr_base_url,
+    Campaign.is_active,
+    Campaign.created_at,
+)
+
+
 def create_campaign(campaign_data: CampaignCreate, session: Session) -> Campaign:
     campaign = Campaign(
         name=campaign_data.name,
@@ -14,8 +32,7 @@ def create_campaign(campaign_data: CampaignCreate, session: Session) -> Campaign
         qr_base_url=campaign_data.qr_base_url,
     )
     session.add(campaign)
-    session.commit()
-    session.refresh(campaign)
+    session.flush()
     return campaign
 
 
@@ -23,5 +40,65 @@ def get_campaign_by_id(campaign_id: uuid.UUID, session: Session) -> Optional[Cam
     return session.exec(select(Campaign).where(Campaign.id == campaign_id)).first()
 
 
-def get_all_campaigns(session: Session) -> List[Campaign]:
-    return list(session.exec(select(Campaign)).all())
+async def get_campaign_by_id_async(campaign_id: uuid.UUID, session: AsyncSession) -> Optional[Campaign]:
+    result = await session.exec(select(Campaign).where(Campaign.id == campaign_id))
+    return result.first()
+
+
+async def get_campaign_snapshot_async(campaign_id: uuid.UUID) -> Optional[CampaignSnapshot]:
+    """Cached campaign lookup for the session hot path. A miss loads the row on its
+    own short-lived session, shared by every concurrent caller for that id."""
+
+    async def load() -> Optional[CampaignSnapshot]:
+        async with AsyncSession(async_engine) as db:
+            campaign = await get_campaign_by_id_async(campaign_id, db)
+        return CampaignSnapshot.from_campaign(campaign) if campaign else None
+
+    return await campaign_cache.get_or_load(campaign_id, load)
+
+
+def get_campaigns_page(
+    after: Optional[tuple[datetime, uuid.UUID]],
+    limit: int,
+    session: Session,
+) -> List[Row]:
+    """Up to `limit + 1` campaigns after the (created_at, id) key, as plain rows."""
+    query = keyset(select(*CAMPAIGN_RESPONSE_COLUMNS), Campaign.created_at, Campaign.id, after, limit)
+    return list(session.exec(query).all())
+
+
+async def stream_campaign_interactions_async(
+    campaign_id: uuid.UUID,
+    start: Optional[datetime],
+    end: Optional[datetime],
+    chunk_size: int,
+) -> AsyncIterator[Sequence[Row]]:
+    """Interactions of every session of the campaign in [start, end), oldest first,
+    in chunks of `chunk_size` rows read through a server-side cursor.
+
+    A connection is checked out on the first chunk and returned as soon as
+    the last one is read or the consumer stops iterating.
+    """
+    query = (
+        select(
+            Interaction.id,
+            Interaction.session_id,
+            Interaction.action_type,
+            Interaction.payload,
+            Interaction.created_at,
+            CTVSession.created_at.label("session_created_at"),
+            CTVSession.paired_at.label("session_paired_at"),
+        )
+        .join(CTVSession, CTVSession.id == Interaction.session_id)
+        .where(CTVSession.campaign_id == campaign_id)
+        .order_by(Interaction.created_at, Interaction.id)
+        .execution_options(yield_per=chunk_size)
+    )
+    if start:
+        query = query.where(Interaction.created_at >= start)
+    if end:
+        query = query.where(Interaction.created_at < end)
+    async with async_engine.connect() as connection:
+        result = await connection.stream(query)
+        async for chunk in result.partitions(chunk_size):
+            yield chunk
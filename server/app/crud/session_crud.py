@@ -1,8 +1,11 @@
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 import uuid
 
+from sqlalchemy import Row, insert, or_, tuple_, update
 from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.core.session_cache import session_state_cache
 from app.models import CTVSession, Interaction
 from app.models.ctv_session import SessionStatus
 
@@ -23,8 +26,7 @@ def create_ctv_session(
         expires_at=expires_at,
     )
     session.add(ctv_session)
-    session.commit()
-    session.refresh(ctv_session)
+    session.flush()
     return ctv_session
 
 
@@ -43,12 +45,12 @@ def update_session_status(
     status: SessionStatus,
     db: Session,
 ) -> CTVSession:
+    session_state_cache.invalidate(ctv_session.id)
     ctv_session.status = status
     if status == SessionStatus.paired:
         ctv_session.paired_at = datetime.now()
     db.add(ctv_session)
-    db.commit()
-    db.refresh(ctv_session)
+    db.flush()
     return ctv_session
 
 
@@ -64,6 +66,172 @@ def create_interaction(
         payload=payload,
     )
     db.add(interaction)
-    db.commit()
-    db.refresh(interaction)
+    db.flush()
     return interaction
+
+
+# ─── Async variants (used by the CTV session hot path) ───────────────────────
+
+async def create_ctv_session_async(
+    campaign_id: uuid.UUID,
+    claim_token_hash: str,
+    claim_token_expires_at: datetime,
+    expires_at: datetime,
+    session: AsyncSession,
+) -> CTVSession:
+    ctv_session = CTVSession(
+        campaign_id=campaign_id,
+        pairing_code=None,
+        claim_token_hash=claim_token_hash,
+        claim_token_expires_at=claim_token_expires_at,
+        status=SessionStatus.waiting_for_pair,
+        expires_at=expires_at,
+    )
+    session.add(ctv_session)
+    await session.flush()
+    return ctv_session
+
+
+async def get_ctv_session_by_id_async(session_id: uuid.UUID, db: AsyncSession) -> Optional[CTVSession]:
+    result = await db.exec(select(CTVSession).where(CTVSession.id == session_id))
+    return result.first()
+
+
+async def get_session_by_claim_token_hash_async(
+    claim_token_hash: str,
+    db: AsyncSession,
+) -> Optional[CTVSession]:
+    result = await db.exec(select(CTVSession).where(CTVSession.claim_token_hash == claim_token_hash))
+    return result.first()
+
+
+async def claim_ctv_session_async(
+    claim_token_hash: str,
+    campaign_id: Optional[uuid.UUID],
+    now: datetime,
+    db: AsyncSession,
+) -> Optional[Row]:
+    """Pair a waiting, unexpired session in a single conditional UPDATE.
+
+    Returns the claimed row's (id, campaign_id, status, expires_at, paired_at), or
+    None when nothing matched. Two phones racing on the same token cannot both
+    win: the second UPDATE waits for the first transaction, then no longer sees
+    status = waiting_for_pair.
+    """
+    statement = (
+        update(CTVSession)
+        .where(
+            CTVSession.claim_token_hash == claim_token_hash,
+            CTVSession.status == SessionStatus.waiting_for_pair,
+            or_(CTVSession.expires_at.is_(None), CTVSession.expires_at > now),
+            or_(CTVSession.claim_token_expires_at.is_(None), CTVSession.claim_token_expires_at > now),
+        )
+        .values(status=SessionStatus.paired, paired_at=now)
+        .returning(
+            CTVSession.id,
+            CTVSession.campaign_id,
+            CTVSession.status,
+            CTVSession.expires_at,
+            CTVSession.paired_at,
+        )
+    )
+    if campaign_id:
+        statement = statement.where(CTVSession.campaign_id == campaign_id)
+    result = await db.exec(statement)
+    row = result.first()
+    if row:
+        session_state_cache.invalidate(row.id)
+    return row
+
+
+async def expire_sessions_batch_async(now: datetime, limit: int, db: AsyncSession) -> int:
+    """Flip up to `limit` overdue live sessions to expired; returns the row count.
+
+    Served by the (status, expires_at) index. SKIP LOCKED lets several workers
+    sweep concurrently without waiting on each other's batches.
+    """
+    overdue = (
+        select(CTVSession.id)
+        .where(
+            CTVSession.status.in_([SessionStatus.waiting_for_pair, SessionStatus.paired]),
+            CTVSession.expires_at < now,
+        )
+        .order_by(CTVSession.expires_at)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+    statement = (
+        update(CTVSession)
+        .where(CTVSession.id.in_(overdue))
+        .values(status=SessionStatus.expired)
+        .execution_options(synchronize_session=False)
+    )
+    result = await db.exec(statement)
+    return result.rowcount
+
+
+async def update_session_status_async(
+    ctv_session: CTVSession,
+    status: SessionStatus,
+    db: AsyncSession,
+) -> CTVSession:
+    session_state_cache.invalidate(ctv_session.id)
+    ctv_session.status = status
+    if status == SessionStatus.paired:
+        ctv_session.paired_at = datetime.now()
+    db.add(ctv_session)
+    await db.flush()
+    return ctv_session
+
+
+async def create_interaction_async(
+    session_id: uuid.UUID,
+    action_type: str,
+    payload: dict,
+    db: AsyncSession,
+) -> Interaction:
+    interaction = Interaction(
+        session_id=session_id,
+        action_type=action_type,
+        payload=payload,
+    )
+    db.add(interaction)
+    await db.flush()
+    return interaction
+
+
+async def create_interactions_async(
+    session_id: uuid.UUID,
+    items: List[tuple[str, dict]],
+    db: AsyncSession,
+) -> List[Interaction]:
+    """Persist (action_type, payload) pairs with one multi-row INSERT. Ids and
+    timestamps are generated client-side, so nothing needs to be read back."""
+    interactions = [
+        Interaction(session_id=session_id, action_type=action_type, payload=payload)
+        for action_type, payload in items
+    ]
+    await db.exec(insert(Interaction).values([interaction.model_dump() for interaction in interactions]))
+    return interactions
+
+
+async def get_interactions_after_async(
+    session_id: uuid.UUID,
+    after: Optional[tuple[datetime, uuid.UUID]],
+    until: datetime,
+    limit: int,
+    db: AsyncSession,
+) -> List[Interaction]:
+    """Keyset page of a session's interactions ordered by (created_at, id), served by
+    the (session_id, created_at, id) index. Rows created after `until` are left
+    for a later page."""
+    query = (
+        select(Interaction)
+        .where(Interaction.session_id == session_id, Interaction.created_at <= until)
+        .order_by(Interaction.created_at, Interaction.id)
+        .limit(limit)
+    )
+    if after:
+        query = query.where(tuple_(Interaction.created_at, Interaction.id) > tuple_(*after))
+    result = await db.exec(query)
+    return list(result.all())
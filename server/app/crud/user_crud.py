@@ -1,6 +1,11 @@
-from typing import Optional
+from datetime import datetime
+from typing import List, Optional
+import uuid
 
+from sqlalchemy import Row, update
 from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.core.pagination import keyset
 from app.models import User
 from app.models.user import (
     UserCreateHashed,
@@ -11,6 +16,23 @@ from app.models.user import (
 )
 
 
+def get_users_page(
+    after: Optional[tuple[datetime, uuid.UUID]],
+    limit: int,
+    session: Session,
+) -> List[Row]:
+    """Up to `limit + 1` users after the (created_at, id) key, as (id, created_at,
+    email, username, bio) rows: never the password hash."""
+    query = keyset(
+        select(User.id, User.created_at, User.email, User.username, User.bio),
+        User.created_at,
+        User.id,
+        after,
+        limit,
+    )
+    return list(session.exec(query).all())
+
+
 def get_user_by_email(email: str, session: Session) -> Optional[UserResponseWithId]:
     query = select(User).where(User.email == email)
     db_user = session.exec(query).first()
@@ -45,8 +67,7 @@ def create_user(user: UserCreateHashed, session: Session):
         hashed_password=user.hashed_password,
     )
     session.add(new_user)
-    session.commit()
-    session.refresh(new_user)
+    session.flush()
     return new_user
 
 
@@ -62,6 +83,18 @@ def get_user_hashed_password(email: str, session: Session):
     )
 
 
+async def replace_password_hash_async(email: str, stale_hash: str, new_hash: str, db: AsyncSession) -> bool:
+    """Swap in an upgraded hash, unless the password changed since `stale_hash` was read."""
+    statement = (
+        update(User)
+        .where(User.email == email, User.hashed_password == stale_hash)
+        .values(hashed_password=new_hash)
+        .execution_options(synchronize_session=False)
+    )
+    result = await db.exec(statement)
+    return result.rowcount == 1
+
+
 def update_user(user_data: UserUpdate, email: str, session: Session):
     db_user = session.exec(select(User).where(User.email == email)).first()
     if not db_user:
@@ -71,8 +104,7 @@ def update_user(user_data: UserUpdate, email: str, session: Session):
         setattr(db_user, key, value)
 
     session.add(db_user)
-    session.commit()
-    session.refresh(db_user)
+    session.flush()
     return db_user
 
 
@@ -81,4 +113,5 @@ def delete_user(email: str, session: Session) -> bool:
     if not db_user:
         return False
     session.delete(db_user)
+    session.flush()
     return True
@@ -1,16 +1,24 @@
 
-from typing import List
+from datetime import datetime
+from typing import List, Optional
+import uuid
+from sqlalchemy import Row
 from sqlmodel import Session, select
+from app.core.pagination import keyset
 from app.models import Vote
 
 
-def get_all_votes(session: Session) -> List[Vote]:
-    query = select(Vote)
+def get_votes_page(
+    after: Optional[tuple[datetime, uuid.UUID]],
+    limit: int,
+    session: Session,
+) -> List[Row]:
+    """Up to `limit + 1` (id, role, created_at) rows after the (created_at, id) key."""
+    query = keyset(select(Vote.id, Vote.role, Vote.created_at), Vote.created_at, Vote.id, after, limit)
     return list(session.exec(query).all())
 
 
 def create_vote(vote: Vote, session: Session) -> Vote:
     session.add(vote)
-    session.commit()
-    session.refresh(vote)
+    session.flush()
     return vote
@@ -1,8 +1,17 @@
-from typing import Iterator
+import time
+from typing import AsyncIterator, Iterator
 
 from dotenv import load_dotenv
+from fastapi import Request
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 from sqlmodel import SQLModel, Session, create_engine
+from sqlmodel.ext.asyncio.session import AsyncSession
 from app.core.config import settings
+from app.core.metrics import registry
+from app.core.sql_instrumentation import instrument_engine
+from app.core.unit_of_work import bind
 
 load_dotenv()
 
@@ -13,14 +22,107 @@ if not DATABASE_URL:
         "DATABASE_URL is not set. Configure it in your environment (Supabase direct connection string)."
     )
 
-engine = create_engine(DATABASE_URL, pool_pre_ping=True, pool_size=10, max_overflow=5)
+# Sync drivers mapped to their asyncio counterparts. psycopg (v3) understands the
+# same libpq query parameters as psycopg2 (e.g. ?sslmode=require for Supabase).
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+psycopg",
+    "postgresql+psycopg2": "postgresql+psycopg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+
+def to_async_url(url: str) -> str:
+    sa_url = make_url(url)
+    drivername = ASYNC_DRIVERS.get(sa_url.drivername, sa_url.drivername)
+    return sa_url.set(drivername=drivername).render_as_string(hide_password=False)
+
+
+ASYNC_DATABASE_URL = to_async_url(DATABASE_URL)
+
+db_pool_wait = registry.histogram(
+    "db_pool_wait_seconds",
+    "Time spent getting a connection from the pool (waiting for a free one, or opening one)",
+    labelnames=("engine",),
+)
+db_pool_checked_out = registry.gauge("db_pool_checked_out", "Connections currently in use", labelnames=("engine",))
+db_pool_idle = registry.gauge("db_pool_idle", "Connections open and idle in the pool", labelnames=("engine",))
+db_pool_overflow = registry.gauge(
+    "db_pool_overflow",
+    "Connections open beyond pool_size (max_overflow in use)",
+    labelnames=("engine",),
+)
+
+
+class _TimedCheckout:
+    """Pool mixin recording how long each checkout takes. A saturated pool shows up
+    here long before it raises a timeout."""
+
+    engine_label = ""
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            db_pool_wait.labels(self.engine_label).observe(time.perf_counter() - started)
+
+
+class TimedQueuePool(_TimedCheckout, QueuePool):
+    engine_label = "sync"
+
+
+class TimedAsyncQueuePool(_TimedCheckout, AsyncAdaptedQueuePool):
+    engine_label = "async"
+
+
+engine = create_engine(
+    DATABASE_URL,
+    poolclass=TimedQueuePool,
+    pool_pre_ping=True,
+    pool_size=10,
+    max_overflow=5,
+)
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL,
+    poolclass=TimedAsyncQueuePool,
+    pool_pre_ping=True,
+    pool_size=10,
+    max_overflow=5,
+)
+
+instrument_engine(engine)
+instrument_engine(async_engine.sync_engine)
+
+for _pool in (engine.pool, async_engine.pool):
+    _label = _pool.engine_label
+    db_pool_checked_out.labels(_label).set_function(_pool.checkedout)
+    db_pool_idle.labels(_label).set_function(_pool.checkedin)
+    # overflow() counts up from -pool_size until the pool is full
+    db_pool_overflow.labels(_label).set_function(lambda pool=_pool: max(0, pool.overflow()))
 
 
 def create_db_and_tables():
     SQLModel.metadata.create_all(engine)
 
-def get_session() -> Iterator[Session]:
-    with Session(engine) as session:
-        yield session
+def get_session(request: Request) -> Iterator[Session]:
+    # expire_on_commit=False: ids and timestamps are generated client-side, so the
+    # objects stay valid after commit and writes need no refresh() SELECT
+    with Session(engine, expire_on_commit=False) as session:
+        # Committed by UnitOfWorkRoute before the response is sent
+        bind(request, session)
+        try:
+            yield session
+        except Exception:
+            session.rollback()
+            raise
 
 
+async def get_async_session(request: Request) -> AsyncIterator[AsyncSession]:
+    # expire_on_commit=False: attribute access after commit must not trigger lazy IO
+    async with AsyncSession(async_engine, expire_on_commit=False) as session:
+        bind(request, session)
+        try:
+            yield session
+        except Exception:
+            await session.rollback()
+            raise
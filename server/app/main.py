@@ -4,12 +4,20 @@ from contextlib import asynccontextmanager
 
 from app.core.config import settings
 from app.core.exceptions import AppException
+from app.core.expiry_sweeper import expiry_sweeper
+from app.core.ingestion import interaction_ingestor
+from app.core.loop_monitor import loop_monitor
+from app.core.metrics_export import metrics_exporter
+from app.core.profiling import ProfilingMiddleware
+from app.core.request_metrics import RequestMetricsMiddleware
+from app.core.sql_instrumentation import SQLInstrumentationMiddleware
+from app.core.ws_manager import ws_manager
 from app.core.exception_handlers import (
     app_exception_handler,
     http_exception_handler,
     unhandled_exception_handler,
 )
-from app.routes import user, vote, campaign, session, ws
+from app.routes import user, vote, campaign, session, ws, metrics, debug
 from app.db import create_db_and_tables
 
 import uvicorn
@@ -18,7 +26,18 @@ import uvicorn
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     create_db_and_tables()
+    await ws_manager.start()
+    # Always running: the phone WebSocket persists through it whatever the HTTP mode
+    await interaction_ingestor.start()
+    await expiry_sweeper.start()
+    await loop_monitor.start()
+    await metrics_exporter.start()
     yield
+    await metrics_exporter.stop()
+    await loop_monitor.stop()
+    await expiry_sweeper.stop()
+    await interaction_ingestor.stop()
+    await ws_manager.stop()
 
 
 app = FastAPI(
@@ -36,6 +55,13 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+# Opt-in: only installed when profiles can be triggered and read (sampling
+# without the secret is rejected by Settings)
+if settings.PROFILING_SECRET:
+    app.add_middleware(ProfilingMiddleware)
+app.add_middleware(SQLInstrumentationMiddleware)
+# Added last so it is outermost and times the whole stack
+app.add_middleware(RequestMetricsMiddleware)
 
 # Register exception handlers (order: most specific → least specific)
 app.add_exception_handler(AppException, app_exception_handler)
@@ -48,6 +74,8 @@ app.include_router(vote.router, prefix=settings.API_V1_STR)
 app.include_router(campaign.router, prefix=settings.API_V1_STR)
 app.include_router(session.router, prefix=settings.API_V1_STR)
 app.include_router(ws.router, prefix=settings.API_V1_STR)
+app.include_router(debug.router, prefix=settings.API_V1_STR)
+app.include_router(metrics.router)
 
 
 @app.get("/")
@@ -2,7 +2,7 @@ from datetime import datetime
 from typing import Any, List, Optional
 import uuid
 
-from sqlalchemy import Column
+from sqlalchemy import Column, Index, func
 from sqlalchemy.types import JSON
 from sqlmodel import Field, Relationship
 from app.models.user import UserBase
@@ -13,26 +13,37 @@ from app.models.interaction import InteractionBase
 
 
 class User(UserBase, table=True):
+    __table_args__ = (Index("ix_user_created_at_id", "created_at", "id"),)
+
     id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
     hashed_password: str
-    created_at: Optional[datetime] = Field(default_factory=datetime.now)
+    created_at: datetime = Field(default_factory=datetime.now, sa_column_kwargs={"server_default": func.now()})
     updated_at: Optional[datetime] = Field(default=None, sa_column_kwargs={"onupdate": datetime.now})
 
 
 class Vote(VoteBase, table=True):
+    __table_args__ = (Index("ix_vote_created_at_id", "created_at", "id"),)
+
     id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
-    created_at: Optional[datetime] = Field(default_factory=datetime.now)
+    created_at: datetime = Field(default_factory=datetime.now, sa_column_kwargs={"server_default": func.now()})
     updated_at: Optional[datetime] = Field(default=None, sa_column_kwargs={"onupdate": datetime.now})
 
 
 class Campaign(CampaignBase, table=True):
+    __table_args__ = (Index("ix_campaign_created_at_id", "created_at", "id"),)
+
     id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
     interaction_config: Optional[list] = Field(default=[], sa_column=Column(JSON))
-    created_at: Optional[datetime] = Field(default_factory=datetime.now)
+    created_at: datetime = Field(default_factory=datetime.now, sa_column_kwargs={"server_default": func.now()})
     updated_at: Optional[datetime] = Field(default=None, sa_column_kwargs={"onupdate": datetime.now})
 
 
 class CTVSession(CTVSessionBase, table=True):
+    __table_args__ = (
+        Index("ix_ctvsession_status_expires_at", "status", "expires_at"),
+        Index("ix_ctvsession_campaign_id", "campaign_id"),
+    )
+
     id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
     paired_at: Optional[datetime] = Field(default=None)
     created_at: Optional[datetime] = Field(default_factory=datetime.now)
@@ -40,9 +51,11 @@ class CTVSession(CTVSessionBase, table=True):
 
 
 class Interaction(InteractionBase, table=True):
+    __table_args__ = (Index("ix_interaction_session_id_created_at_id", "session_id", "created_at", "id"),)
+
     id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
     payload: Optional[dict] = Field(default={}, sa_column=Column(JSON))
-    created_at: Optional[datetime] = Field(default_factory=datetime.now)
+    created_at: datetime = Field(default_factory=datetime.now, sa_column_kwargs={"server_default": func.now()})
 
 
 __all__ = ["User", "Vote", "Campaign", "CTVSession", "Interaction"]
@@ -26,3 +26,8 @@ class CampaignResponse(SQLModel):
     qr_base_url: str
     is_active: bool
     created_at: Optional[datetime] = None
+
+
+class CampaignPage(SQLModel):
+    items: list[CampaignResponse] = []
+    next_cursor: Optional[str] = None
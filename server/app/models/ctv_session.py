@@ -34,6 +34,7 @@ class CTVSessionRegisterResponse(SQLModel):
     campaign_id: uuid.UUID
     status: SessionStatus
     claim_token: str
+    ctv_token: str
     qr_url: str
     created_at: Optional[datetime] = None
     expires_at: Optional[datetime] = None
@@ -1,9 +1,15 @@
 from datetime import datetime
+from enum import Enum
 from typing import Any, Optional
 import uuid
 from sqlmodel import Field, SQLModel
 
 
+class InteractionExportFormat(str, Enum):
+    ndjson = "ndjson"
+    csv = "csv"
+
+
 class InteractionBase(SQLModel):
     session_id: uuid.UUID = Field(foreign_key="ctvsession.id")
     action_type: str
@@ -20,3 +26,21 @@ class InteractionResponse(SQLModel):
     action_type: str
     payload: dict[str, Any] = {}
     created_at: Optional[datetime] = None
+
+
+class InteractionPage(SQLModel):
+    items: list[InteractionResponse] = []
+    next_cursor: Optional[str] = None
+
+
+class InteractionBatchItemResult(SQLModel):
+    index: int
+    accepted: bool
+    interaction: Optional[InteractionResponse] = None
+    error: Optional[str] = None
+
+
+class InteractionBatchResponse(SQLModel):
+    accepted: int
+    rejected: int
+    results: list[InteractionBatchItemResult] = []
@@ -0,0 +1,12 @@
+from datetime import datetime
+from sqlmodel import SQLModel
+
+
+class ProfileSummary(SQLModel):
+    id: str
+    method: str
+    path: str
+    route: str
+    started_at: datetime
+    duration_ms: float
+    samples: int
@@ -34,6 +34,11 @@ class UserResponse(SQLModel):
     bio: Optional[str] = None
 
 
+class UserPage(SQLModel):
+    items: list[UserResponse] = []
+    next_cursor: Optional[str] = None
+
+
 class UserResponseWithId(UserResponse):
     id: uuid.UUID
 
@@ -16,3 +16,8 @@ class VoteCreate(VoteBase):
 
 class VoteResponse(VoteBase):
     created_at: Optional[datetime] = None
+
+
+class VotePage(SQLModel):
+    items: list[VoteResponse] = []
+    next_cursor: Optional[str] = None
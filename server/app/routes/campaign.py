@@ -1,12 +1,16 @@
-from typing import List
+from datetime import datetime
 import uuid
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import ORJSONResponse
 
 from app.core.dependencies import get_campaign_service
-from app.models.campaign import CampaignCreate, CampaignResponse
+from app.core.exports import MEDIA_TYPES, ExportResponse
+from app.models.campaign import CampaignCreate, CampaignPage, CampaignResponse
+from app.models.interaction import InteractionExportFormat
 from app.services.campaign_service import CampaignService
+from app.core.unit_of_work import UnitOfWorkRoute
 
-router = APIRouter(prefix="/campaign", tags=["campaigns"])
+router = APIRouter(prefix="/campaign", tags=["campaigns"], route_class=UnitOfWorkRoute)
 
 
 @router.post("/", response_model=CampaignResponse, status_code=201)
@@ -14,14 +18,17 @@ def create_campaign(
     campaign: CampaignCreate,
     campaign_service: CampaignService = Depends(get_campaign_service),
 ):
-    return campaign_service.create_campaign(campaign)
+    return ORJSONResponse(campaign_service.create_campaign(campaign), status_code=201)
 
 
-@router.get("/", response_model=List[CampaignResponse], status_code=200)
+@router.get("/", response_model=CampaignPage, status_code=200)
 def get_all_campaigns(
+    after: str | None = None,
+    limit: int = Query(default=100, ge=1, le=500),
     campaign_service: CampaignService = Depends(get_campaign_service),
 ):
-    return campaign_service.get_all_campaigns()
+    # Rows are already in response shape: returned as-is, response_model only documents them
+    return ORJSONResponse(campaign_service.list_campaigns(after, limit))
 
 
 @router.get("/{campaign_id}", response_model=CampaignResponse, status_code=200)
@@ -29,4 +36,22 @@ def get_campaign(
     campaign_id: uuid.UUID,
     campaign_service: CampaignService = Depends(get_campaign_service),
 ):
-    return campaign_service.get_campaign(campaign_id)
+    return ORJSONResponse(campaign_service.get_campaign(campaign_id))
+
+
+@router.get("/{campaign_id}/interactions/export", response_class=ExportResponse, status_code=200)
+async def export_interactions(
+    campaign_id: uuid.UUID,
+    export_format: InteractionExportFormat = Query(default=InteractionExportFormat.ndjson, alias="format"),
+    start: datetime | None = Query(default=None, alias="from"),
+    end: datetime | None = Query(default=None, alias="to"),
+    campaign_service: CampaignService = Depends(get_campaign_service),
+):
+    """raw interactions of every session of the campaign, oldest first, created in [from, to)"""
+    stream = await campaign_service.export_interactions(campaign_id, export_format, start, end)
+    filename = f"campaign-{campaign_id}-interactions.{export_format.value}"
+    return ExportResponse(
+        stream,
+        media_type=MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
@@ -0,0 +1,44 @@
+from typing import List
+from fastapi import APIRouter, Depends
+from fastapi.responses import PlainTextResponse
+
+from app.core.dependencies import require_profile_signature
+from app.core.exceptions import ProfileNotFoundException
+from app.core.profiling import profiler
+from app.models.profiling import ProfileSummary
+
+router = APIRouter(
+    prefix="/debug",
+    tags=["debug"],
+    include_in_schema=False,
+    dependencies=[Depends(require_profile_signature)],
+)
+
+
+@router.get("/profiles", response_model=List[ProfileSummary], status_code=200)
+async def list_profiles():
+    """the slowest profiled requests, slowest first (needs a valid X-Profile header)"""
+    return [
+        ProfileSummary(
+            id=profile.id,
+            method=profile.method,
+            path=profile.path,
+            route=profile.route,
+            started_at=profile.started_at,
+            duration_ms=round(profile.duration * 1000, 3),
+            samples=profile.samples,
+        )
+        for profile in profiler.profiles()
+    ]
+
+
+@router.get("/profiles/{profile_id}", response_class=PlainTextResponse, status_code=200)
+async def get_profile(profile_id: str):
+    """one profile as collapsed stacks, for flamegraph.pl / speedscope / inferno"""
+    profile = profiler.get(profile_id)
+    if profile is None:
+        raise ProfileNotFoundException(profile_id)
+    return PlainTextResponse(
+        profile.folded(),
+        headers={"Content-Disposition": f'attachment; filename="profile-{profile.id}.folded"'},
+    )
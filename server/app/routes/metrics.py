@@ -0,0 +1,12 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from app.core.metrics_export import metrics_exporter
+
+router = APIRouter(tags=["metrics"])
+
+
+@router.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def metrics():
+    """Prometheus scrape endpoint (all workers when METRICS_DIR is set)."""
+    return PlainTextResponse(await metrics_exporter.render(), media_type="text/plain; version=0.0.4")
@@ -1,7 +1,10 @@
+from typing import Any
 import uuid
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Header, Query
+from fastapi.responses import StreamingResponse
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 
+from app.core.config import settings
 from app.core.dependencies import get_session_service
 from app.models.ctv_session import (
     CTVSessionClaim,
@@ -9,21 +12,28 @@ from app.models.ctv_session import (
     CTVSessionRegister,
     CTVSessionRegisterResponse,
     CTVSessionStatusResponse,
+    SessionStatus,
+)
+from app.models.interaction import (
+    InteractionBatchResponse,
+    InteractionCreate,
+    InteractionPage,
+    InteractionResponse,
 )
-from app.models.interaction import InteractionCreate, InteractionResponse
 from app.services.session_service import SessionService
+from app.core.unit_of_work import UnitOfWorkRoute
 
-router = APIRouter(prefix="/session", tags=["sessions"])
+router = APIRouter(prefix="/session", tags=["sessions"], route_class=UnitOfWorkRoute)
 interaction_bearer = HTTPBearer(auto_error=False)
 
 
 @router.post("/register", response_model=CTVSessionRegisterResponse, status_code=201)
-def register_session(
+async def register_session(
     data: CTVSessionRegister,
     session_service: SessionService = Depends(get_session_service),
 ):
     """called by the ctv after pressing a button"""
-    return session_service.register_session(data.campaign_id)
+    return await session_service.register_session(data.campaign_id)
 
 
 @router.post("/claim", response_model=CTVSessionClaimResponse, status_code=200)
@@ -47,9 +57,54 @@ async def interact(
     return await session_service.handle_interaction(session_id, data, token)
 
 
+@router.post("/interact/{session_id}/batch", response_model=InteractionBatchResponse, status_code=200)
+async def interact_batch(
+    session_id: uuid.UUID,
+    data: list[dict[str, Any]],
+    creds: HTTPAuthorizationCredentials | None = Depends(interaction_bearer),
+    session_service: SessionService = Depends(get_session_service),
+):
+    """called by the smartphone with an ordered array of interactions (swipe, tilt...)"""
+    token = creds.credentials if creds else ""
+    return await session_service.handle_interaction_batch(session_id, data, token)
+
+
+@router.get("/{session_id}/interactions", response_model=InteractionPage, status_code=200)
+async def list_interactions(
+    session_id: uuid.UUID,
+    after: str | None = None,
+    limit: int = Query(default=100, ge=1, le=500),
+    creds: HTTPAuthorizationCredentials | None = Depends(interaction_bearer),
+    session_service: SessionService = Depends(get_session_service),
+):
+    """called by the ctv (ctv_token) or the smartphone (interaction_token) to read new interactions"""
+    token = creds.credentials if creds else ""
+    return await session_service.list_interactions(session_id, token, after, limit)
+
+
+@router.get("/{session_id}/events", response_class=StreamingResponse, status_code=200)
+async def stream_events(
+    session_id: uuid.UUID,
+    token: str | None = None,
+    last_event_id: str | None = Header(default=None, alias="Last-Event-ID"),
+    creds: HTTPAuthorizationCredentials | None = Depends(interaction_bearer),
+    session_service: SessionService = Depends(get_session_service),
+):
+    """server-sent events for ctvs without websocket support (EventSource passes the token as ?token=)"""
+    stream = await session_service.open_event_stream(session_id, creds.credentials if creds else token or "", last_event_id)
+    return StreamingResponse(
+        stream,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.get("/{session_id}", response_model=CTVSessionStatusResponse, status_code=200)
-def get_session_status(
+async def get_session_status(
     session_id: uuid.UUID,
+    wait: int = Query(default=0, ge=0, le=settings.LONG_POLL_MAX_WAIT_SECONDS),
+    known_status: SessionStatus | None = None,
     session_service: SessionService = Depends(get_session_service),
 ):
-    return session_service.get_session_status(session_id)
+    """called by the ctv; with wait + known_status it long-polls until the status changes"""
+    return await session_service.get_session_status(session_id, wait, known_status)
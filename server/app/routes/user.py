@@ -1,16 +1,15 @@
-from fastapi import APIRouter, Depends, Response, status
-from app.models import User
-from sqlmodel import Session, select
+from fastapi import APIRouter, BackgroundTasks, Depends, Query, Response, status
+from fastapi.responses import ORJSONResponse
 from typing import Annotated
 from fastapi.security import OAuth2PasswordRequestForm
 
-from app.db import get_session
-from app.models.user import UserCreate, UserResponse, UserResponseWithId, UserUpdate
+from app.models.user import UserCreate, UserPage, UserResponse, UserResponseWithId, UserUpdate
 from app.core.dependencies import get_current_active_user, get_user_service
 from app.services.user_service import UserService
 from app.core.config import settings
+from app.core.unit_of_work import UnitOfWorkRoute
 
-router = APIRouter(prefix="/user", tags=["users"])
+router = APIRouter(prefix="/user", tags=["users"], route_class=UnitOfWorkRoute)
 
 COOKIE_NAME = "access_token"
 
@@ -28,32 +27,38 @@ def set_auth_cookie(response: Response, token: str):
 
 
 @router.post("/signup", response_model=UserResponse, status_code=201)
-def create_user(
+async def create_user(
     user: UserCreate,
     response: Response,
     user_service: UserService = Depends(get_user_service),
 ):
-    new_user = user_service.create_user(user)
+    new_user = await user_service.create_user(user)
     access_token = user_service.create_access_token(user.email)
     set_auth_cookie(response, access_token)
     return UserResponse(**new_user.model_dump(exclude_unset=True))
 
 
 @router.post("/token", response_model=UserResponse)
-def get_access_token(
+async def get_access_token(
     response: Response,
+    background_tasks: BackgroundTasks,
     form_data: Annotated[OAuth2PasswordRequestForm, Depends()],
     user_service: UserService = Depends(get_user_service),
 ):
-    user = user_service.authenticate_user(form_data.username, form_data.password)
+    user = await user_service.authenticate_user(form_data.username, form_data.password, background_tasks)
     access_token = user_service.create_access_token(user.email)
     set_auth_cookie(response, access_token)
     return UserResponse(**user.model_dump(exclude_unset=True))
 
 
-@router.get("/", response_model=list[UserResponse])
-def get_all_users(session: Session = Depends(get_session)):
-    return session.exec(select(User)).all()
+@router.get("/", response_model=UserPage)
+def get_all_users(
+    after: str | None = None,
+    limit: int = Query(default=100, ge=1, le=500),
+    user_service: UserService = Depends(get_user_service),
+):
+    # Rows are already in response shape: returned as-is, response_model only documents them
+    return ORJSONResponse(user_service.list_users(after, limit))
 
 
 @router.get("/me", response_model=UserResponse)
@@ -1,16 +1,22 @@
-from typing import List
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import ORJSONResponse
 
 from app.core.dependencies import get_vote_service
-from app.models.vote import Role, VoteResponse
+from app.models.vote import Role, VotePage
 from app.services.vote_service import VoteService
+from app.core.unit_of_work import UnitOfWorkRoute
 
-router = APIRouter(prefix="/vote", tags=["votes"])
+router = APIRouter(prefix="/vote", tags=["votes"], route_class=UnitOfWorkRoute)
 
 
-@router.get("/", response_model=List[VoteResponse], status_code=200)
-def get_all_votes(vote_service: VoteService = Depends(get_vote_service)):
-    return vote_service.get_all_votes()
+@router.get("/", response_model=VotePage, status_code=200)
+def get_all_votes(
+    after: str | None = None,
+    limit: int = Query(default=100, ge=1, le=500),
+    vote_service: VoteService = Depends(get_vote_service),
+):
+    # Rows are already in response shape: returned as-is, response_model only documents them
+    return ORJSONResponse(vote_service.list_votes(after, limit))
 
 
 @router.post("/{role}", status_code=201)
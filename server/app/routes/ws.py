@@ -1,25 +1,43 @@
+from datetime import datetime
+import time
 import uuid
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
+import orjson
+from pydantic import ValidationError
 
+from app.core.exceptions import AppException
+from app.core.metrics import registry
 from app.core.ws_manager import ws_manager
-from app.crud.session_crud import get_ctv_session_by_id
-from app.db import engine
+from app.crud.session_crud import get_ctv_session_by_id_async
+from app.db import async_engine
+from app.models.interaction import InteractionCreate
+from app.services.session_service import SessionService
 
-from sqlmodel import Session as DBSession
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 router = APIRouter(tags=["websocket"])
 
+# HTTP status of a rejected admission -> WebSocket close code (4xxx = application defined)
+CLOSE_CODES = {401: 4001, 404: 4004, 409: 4009, 410: 4010}
+
+phone_relay_latency = registry.histogram(
+    "phone_relay_latency_seconds",
+    "Time from receiving a phone frame to handing the interaction to the CTV's socket",
+)
+phone_sockets_open = registry.gauge("phone_sockets_open", "Phone WebSocket connections currently open")
+
 
 @router.websocket("/ws/ctv/{session_id}")
 async def ctv_websocket(websocket: WebSocket, session_id: uuid.UUID):
     """WebSocket endpoint for CTV ad creatives.
 
     The CTV connects after registering a session and stays connected
-    to receive real-time interaction events from paired smartphones.
+    to receive real-time events: `paired` when a phone claims the session
+    and `interaction` for each accepted phone interaction.
     """
     # Validate session exists (short-lived DB session, not held open for WS lifetime)
-    with DBSession(engine) as db:
-        ctv_session = get_ctv_session_by_id(session_id, db)
+    async with AsyncSession(async_engine) as db:
+        ctv_session = await get_ctv_session_by_id_async(session_id, db)
         if not ctv_session:
             await websocket.close(code=4004, reason="Session not found")
             return
@@ -30,6 +48,64 @@ async def ctv_websocket(websocket: WebSocket, session_id: uuid.UUID):
             data = await websocket.receive_json()
             event = data.get("event")
             if event == "heartbeat":
+                # Goes through the connection's queue so it never races the writer task
+                ws_manager.enqueue(str(session_id), {"event": "heartbeat_ack"})
+    except WebSocketDisconnect:
+        pass
+    finally:
+        ws_manager.disconnect(str(session_id), websocket)
+
+
+@router.websocket("/ws/phone/{session_id}")
+async def phone_websocket(websocket: WebSocket, session_id: uuid.UUID, token: str = ""):
+    """WebSocket endpoint for the phone controller.
+
+    Authenticated with the interaction token returned by claim (`?token=`).
+    Each `{"action_type", "payload"}` frame is relayed to the CTV without a
+    per-message HTTP request or session lookup, and persisted write-behind.
+    The phone gets `{"event": "ack", "id": ...}` per interaction.
+    """
+    # The DB session is only used for admission; relaying never touches it
+    async with AsyncSession(async_engine) as db:
+        service = SessionService(db)
+        try:
+            expires_at = await service.open_phone_channel(session_id, token)
+        except AppException as exc:
+            await websocket.close(code=CLOSE_CODES.get(exc.status_code, 4000), reason=exc.detail)
+            return
+
+    await websocket.accept()
+    phone_sockets_open.inc()
+    try:
+        while True:
+            message = await websocket.receive_text()
+            received_at = time.monotonic()
+            if expires_at and datetime.now() > expires_at:
+                await websocket.close(code=CLOSE_CODES[410], reason="Session expired")
+                return
+            try:
+                data = orjson.loads(message)
+            except orjson.JSONDecodeError:
+                await websocket.send_json({"event": "error", "detail": "Frame is not valid JSON"})
+                continue
+            if not isinstance(data, dict):
+                await websocket.send_json({"event": "error", "detail": "Frame must be a JSON object"})
+                continue
+            if data.get("event") == "heartbeat":
                 await websocket.send_json({"event": "heartbeat_ack"})
+                continue
+            try:
+                interaction = await service.relay_interaction(session_id, InteractionCreate.model_validate(data))
+            except ValidationError as exc:
+                error = "; ".join(f"{'.'.join(map(str, e['loc']))}: {e['msg']}" for e in exc.errors())
+                await websocket.send_json({"event": "error", "detail": error})
+                continue
+            except AppException as exc:
+                await websocket.send_json({"event": "error", "detail": exc.detail})
+                continue
+            phone_relay_latency.observe(time.monotonic() - received_at)
+            await websocket.send_json({"event": "ack", "id": str(interaction.id)})
     except WebSocketDisconnect:
-        ws_manager.disconnect(str(session_id))
+        pass
+    finally:
+        phone_sockets_open.dec()
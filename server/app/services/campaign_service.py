@@ -1,57 +1,91 @@
-from typing import List
+from datetime import datetime
+from typing import Any, AsyncIterator, Optional, Union
 import uuid
 
+from sqlalchemy import Row
 from sqlmodel import Session
-from app.core.exceptions import CampaignNotFoundException
+from app.core.config import settings
+from app.core.exceptions import CampaignNotFoundException, InvalidInputException
+from app.core.exports import csv_chunk, csv_header, export_rows, ndjson_chunk
+from app.core.pagination import decode_cursor, page
 from app.crud.campaign_crud import (
     create_campaign,
-    get_all_campaigns,
     get_campaign_by_id,
+    get_campaign_snapshot_async,
+    get_campaigns_page,
+    stream_campaign_interactions_async,
 )
-from app.models.campaign import CampaignCreate, CampaignResponse
+from app.models import Campaign
+from app.models.campaign import CampaignCreate
+from app.models.interaction import InteractionExportFormat
+
+
+def campaign_response(campaign: Union[Campaign, Row]) -> dict[str, Any]:
+    """CampaignResponse shape of an ORM object or a CAMPAIGN_RESPONSE_COLUMNS row,
+    as a plain dict for ORJSONResponse."""
+    return {
+        "id": campaign.id,
+        "name": campaign.name,
+        "description": campaign.description,
+        "interaction_config": campaign.interaction_config or [],
+        "qr_base_url": campaign.qr_base_url,
+        "is_active": campaign.is_active,
+        "created_at": campaign.created_at,
+    }
 
 
 class CampaignService:
     def __init__(self, session: Session):
         self.session = session
 
-    def create_campaign(self, campaign_data: CampaignCreate) -> CampaignResponse:
-        campaign = create_campaign(campaign_data, self.session)
-        return CampaignResponse(
-            id=campaign.id,
-            name=campaign.name,
-            description=campaign.description,
-            interaction_config=campaign.interaction_config or [],
-            qr_base_url=campaign.qr_base_url,
-            is_active=campaign.is_active,
-            created_at=campaign.created_at,
-        )
-
-    def get_campaign(self, campaign_id: uuid.UUID) -> CampaignResponse:
+    def create_campaign(self, campaign_data: CampaignCreate) -> dict[str, Any]:
+        return campaign_response(create_campaign(campaign_data, self.session))
+
+    def get_campaign(self, campaign_id: uuid.UUID) -> dict[str, Any]:
         campaign = get_campaign_by_id(campaign_id, self.session)
         if not campaign:
             raise CampaignNotFoundException(campaign_id)
-        return CampaignResponse(
-            id=campaign.id,
-            name=campaign.name,
-            description=campaign.description,
-            interaction_config=campaign.interaction_config or [],
-            qr_base_url=campaign.qr_base_url,
-            is_active=campaign.is_active,
-            created_at=campaign.created_at,
-        )
-
-    def get_all_campaigns(self) -> List[CampaignResponse]:
-        campaigns = get_all_campaigns(self.session)
-        return [
-            CampaignResponse(
-                id=c.id,
-                name=c.name,
-                description=c.description,
-                interaction_config=c.interaction_config or [],
-                qr_base_url=c.qr_base_url,
-                is_active=c.is_active,
-                created_at=c.created_at,
-            )
-            for c in campaigns
-        ]
+        return campaign_response(campaign)
+
+    def list_campaigns(self, after: Optional[str], limit: int) -> dict[str, Any]:
+        """CampaignPage shape: oldest first, `next_cursor` is None on the last page."""
+        rows = get_campaigns_page(decode_cursor(after) if after else None, limit, self.session)
+        rows, next_cursor = page(rows, limit)
+        return {"items": [campaign_response(row) for row in rows], "next_cursor": next_cursor}
+
+    async def export_interactions(
+        self,
+        campaign_id: uuid.UUID,
+        export_format: InteractionExportFormat,
+        start: Optional[datetime],
+        end: Optional[datetime],
+    ) -> AsyncIterator[bytes]:
+        """Validate the export and return its body. Nothing is read from the
+        interaction table until the response starts streaming (see ExportResponse)."""
+        start, end = _local_naive(start), _local_naive(end)
+        if start and end and start >= end:
+            raise InvalidInputException("from must be before to")
+        if not await get_campaign_snapshot_async(campaign_id):
+            raise CampaignNotFoundException(campaign_id)
+        return self._export(campaign_id, export_format, start, end)
+
+    async def _export(
+        self,
+        campaign_id: uuid.UUID,
+        export_format: InteractionExportFormat,
+        start: Optional[datetime],
+        end: Optional[datetime],
+    ) -> AsyncIterator[bytes]:
+        encode = csv_chunk if export_format == InteractionExportFormat.csv else ndjson_chunk
+        if export_format == InteractionExportFormat.csv:
+            yield csv_header()
+        async for rows in stream_campaign_interactions_async(campaign_id, start, end, settings.EXPORT_CHUNK_ROWS):
+            export_rows.inc(len(rows))
+            yield encode(rows)
+
+
+def _local_naive(value: Optional[datetime]) -> Optional[datetime]:
+    """Timestamps are stored as naive local time (datetime.now())."""
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone().replace(tzinfo=None)
@@ -1,15 +1,20 @@
+import asyncio
 from datetime import datetime, timedelta
 import hashlib
 import hmac
 import secrets
+from typing import Any, AsyncIterator, NoReturn
 import uuid
 
 import jwt
-from sqlmodel import Session
+from pydantic import ValidationError
+from sqlmodel.ext.asyncio.session import AsyncSession
 from app.core.config import settings
 from app.core.exceptions import (
     CampaignNotFoundException,
     ClaimTokenExpiredException,
+    InteractionBatchTooLargeException,
+    InteractionQueueFullException,
     InteractionTokenInvalidException,
     InvalidClaimTokenException,
     PairingDisabledException,
@@ -18,29 +23,54 @@ from app.core.exceptions import (
     SessionNotFoundException,
     SessionNotPairedException,
 )
-from app.crud.campaign_crud import get_campaign_by_id
+from app.core.event_streams import Subscription, event_streams, format_sse
+from app.core.ingestion import interaction_ingestor
+from app.core.metrics import registry
+from app.core.pagination import decode_cursor, encode_cursor
+from app.core.session_cache import session_state_cache
+from app.core.status_waiters import status_waiters
+from app.core.unit_of_work import after_commit
+from app.core.ws_manager import ws_manager
+from app.crud.campaign_crud import get_campaign_snapshot_async
 from app.crud.session_crud import (
-    create_ctv_session,
-    create_interaction,
-    get_ctv_session_by_id,
-    get_session_by_claim_token_hash,
-    update_session_status,
+    claim_ctv_session_async,
+    create_ctv_session_async,
+    create_interaction_async,
+    create_interactions_async,
+    get_ctv_session_by_id_async,
+    get_interactions_after_async,
+    get_session_by_claim_token_hash_async,
 )
-from app.models import CTVSession
+from app.models import CTVSession, Interaction
 from app.models.ctv_session import (
     CTVSessionClaimResponse,
     CTVSessionRegisterResponse,
     CTVSessionStatusResponse,
     SessionStatus,
 )
-from app.models.interaction import InteractionCreate, InteractionResponse
+from app.models.interaction import (
+    InteractionBatchItemResult,
+    InteractionBatchResponse,
+    InteractionCreate,
+    InteractionPage,
+    InteractionResponse,
+)
 
 SESSION_EXPIRY_SECONDS = 120
 INTERACTION_TOKEN_GRACE_SECONDS = 2
 
+INTERACTION_TOKEN_TYPE = "ctv_session_interaction"
+CTV_TOKEN_TYPE = "ctv_session_viewer"
+
+LIVE_STATUSES = (SessionStatus.waiting_for_pair, SessionStatus.paired)
+
+# Session lifecycle; expiries are counted by the sweeper (ctv_sessions_expired_total)
+sessions_registered = registry.counter("ctv_sessions_registered_total", "CTV sessions registered")
+sessions_claimed = registry.counter("ctv_sessions_claimed_total", "CTV sessions claimed by a phone")
+
 
 class SessionService:
-    def __init__(self, session: Session):
+    def __init__(self, session: AsyncSession):
         self.session = session
 
     def _hash_claim_token(self, claim_token: str) -> str:
@@ -54,11 +84,17 @@ class SessionService:
         return digest
 
     def _create_interaction_token(self, session_id: uuid.UUID, expires_at: datetime) -> str:
+        return self._create_session_token(session_id, expires_at, INTERACTION_TOKEN_TYPE)
+
+    def _create_ctv_token(self, session_id: uuid.UUID, expires_at: datetime) -> str:
+        return self._create_session_token(session_id, expires_at, CTV_TOKEN_TYPE)
+
+    def _create_session_token(self, session_id: uuid.UUID, expires_at: datetime, token_type: str) -> str:
         if not settings.JWT_SECRET_KEY:
             raise RuntimeError("JWT_SECRET_KEY is not configured")
         now = datetime.now()
         payload = {
-            "typ": "ctv_session_interaction",
+            "typ": token_type,
             "sid": str(session_id),
             "iat": now,
             "exp": expires_at,
@@ -66,6 +102,9 @@ class SessionService:
         return jwt.encode(payload, settings.JWT_SECRET_KEY, algorithm=settings.JWT_ALGORITHM)
 
     def _verify_interaction_token(self, token: str, session_id: uuid.UUID) -> None:
+        self._verify_session_token(token, session_id, (INTERACTION_TOKEN_TYPE,))
+
+    def _verify_session_token(self, token: str, session_id: uuid.UUID, token_types: tuple[str, ...]) -> None:
         try:
             payload = jwt.decode(
                 token,
@@ -76,19 +115,25 @@ class SessionService:
         except jwt.InvalidTokenError:
             raise InteractionTokenInvalidException()
 
-        if payload.get("typ") != "ctv_session_interaction":
+        if payload.get("typ") not in token_types:
             raise InteractionTokenInvalidException()
         if payload.get("sid") != str(session_id):
             raise InteractionTokenInvalidException()
 
-    def _check_session_expiry(self, ctv_session: CTVSession) -> None:
+    def _effective_status(self, ctv_session: CTVSession) -> SessionStatus:
+        """Status as of now. The row is only flipped to expired later by the sweeper,
+        so reads derive it from expires_at instead of writing it."""
         if ctv_session.expires_at and datetime.now() > ctv_session.expires_at:
             if ctv_session.status not in (SessionStatus.expired, SessionStatus.closed):
-                update_session_status(ctv_session, SessionStatus.expired, self.session)
+                return SessionStatus.expired
+        return ctv_session.status
+
+    def _check_session_expiry(self, ctv_session: CTVSession) -> None:
+        if ctv_session.expires_at and datetime.now() > ctv_session.expires_at:
             raise SessionExpiredException(ctv_session.id)
 
-    def register_session(self, campaign_id: uuid.UUID) -> CTVSessionRegisterResponse:
-        campaign = get_campaign_by_id(campaign_id, self.session)
+    async def register_session(self, campaign_id: uuid.UUID) -> CTVSessionRegisterResponse:
+        campaign = await get_campaign_snapshot_async(campaign_id)
         if not campaign:
             raise CampaignNotFoundException(campaign_id)
 
@@ -96,7 +141,7 @@ class SessionService:
         expires_at = datetime.now() + timedelta(seconds=SESSION_EXPIRY_SECONDS)
         claim_token_expires_at = expires_at
 
-        ctv_session = create_ctv_session(
+        ctv_session = await create_ctv_session_async(
             campaign_id=campaign_id,
             claim_token_hash=self._hash_claim_token(claim_token),
             claim_token_expires_at=claim_token_expires_at,
@@ -105,12 +150,17 @@ class SessionService:
         )
 
         qr_url = f"{campaign.qr_base_url}#claim={claim_token}"
+        ctv_token = self._create_ctv_token(
+            ctv_session.id, expires_at + timedelta(seconds=INTERACTION_TOKEN_GRACE_SECONDS)
+        )
 
+        await after_commit(self.session, sessions_registered.inc)
         return CTVSessionRegisterResponse(
             id=ctv_session.id,
             campaign_id=ctv_session.campaign_id,
             status=ctv_session.status,
             claim_token=claim_token,
+            ctv_token=ctv_token,
             qr_url=qr_url,
             created_at=ctv_session.created_at,
             expires_at=ctv_session.expires_at,
@@ -124,7 +174,43 @@ class SessionService:
         claim_token: str,
         campaign_id: uuid.UUID | None = None,
     ) -> CTVSessionClaimResponse:
-        ctv_session = get_session_by_claim_token_hash(self._hash_claim_token(claim_token), self.session)
+        claim_token_hash = self._hash_claim_token(claim_token)
+        claimed = await claim_ctv_session_async(claim_token_hash, campaign_id, datetime.now(), self.session)
+        if not claimed:
+            await self._raise_claim_failure(claim_token_hash, campaign_id)
+
+        campaign = await get_campaign_snapshot_async(claimed.campaign_id)
+        if not campaign:
+            raise CampaignNotFoundException(claimed.campaign_id)
+
+        # Only once the claim has committed: a cached entry lets interactions skip the DB check
+        await after_commit(
+            self.session,
+            lambda: session_state_cache.put(claimed.id, claimed.campaign_id, claimed.status, claimed.expires_at),
+        )
+        await after_commit(self.session, sessions_claimed.inc)
+
+        exp = claimed.expires_at or (datetime.now() + timedelta(seconds=SESSION_EXPIRY_SECONDS))
+        exp = exp + timedelta(seconds=INTERACTION_TOKEN_GRACE_SECONDS)
+        interaction_token = self._create_interaction_token(claimed.id, exp)
+
+        paired_event = {
+            "event": "paired",
+            "session_id": str(claimed.id),
+            "paired_at": claimed.paired_at.isoformat() if claimed.paired_at else None,
+        }
+        await after_commit(self.session, lambda: ws_manager.send_to_session(str(claimed.id), paired_event))
+
+        return CTVSessionClaimResponse(
+            session_id=claimed.id,
+            interaction_config=campaign.interaction_config,
+            interaction_token=interaction_token,
+            expires_at=claimed.expires_at,
+        )
+
+    async def _raise_claim_failure(self, claim_token_hash: str, campaign_id: uuid.UUID | None) -> NoReturn:
+        """Work out why the atomic claim matched nothing. Only runs on the failure path."""
+        ctv_session = await get_session_by_claim_token_hash_async(claim_token_hash, self.session)
         if not ctv_session:
             raise InvalidClaimTokenException()
 
@@ -139,22 +225,38 @@ class SessionService:
         if ctv_session.status == SessionStatus.paired:
             raise SessionAlreadyPairedException(ctv_session.id)
 
-        campaign = get_campaign_by_id(ctv_session.campaign_id, self.session)
-        if not campaign:
-            raise CampaignNotFoundException(ctv_session.campaign_id)
+        raise SessionExpiredException(ctv_session.id)
 
-        updated = update_session_status(ctv_session, SessionStatus.paired, self.session)
+    async def _ensure_session_paired(self, session_id: uuid.UUID) -> datetime | None:
+        """Raise unless the session is paired and live; returns its expires_at."""
+        # A cached entry is a paired session that has not reached expires_at yet
+        state = session_state_cache.get(session_id)
+        if state is not None:
+            return state.expires_at
 
-        exp = updated.expires_at or (datetime.now() + timedelta(seconds=SESSION_EXPIRY_SECONDS))
-        exp = exp + timedelta(seconds=INTERACTION_TOKEN_GRACE_SECONDS)
-        interaction_token = self._create_interaction_token(updated.id, exp)
+        ctv_session = await get_ctv_session_by_id_async(session_id, self.session)
+        if not ctv_session:
+            raise SessionNotFoundException(session_id)
 
-        return CTVSessionClaimResponse(
-            session_id=updated.id,
-            interaction_config=campaign.interaction_config or [],
-            interaction_token=interaction_token,
-            expires_at=updated.expires_at,
+        self._check_session_expiry(ctv_session)
+
+        if ctv_session.status != SessionStatus.paired:
+            raise SessionNotPairedException(session_id)
+
+        session_state_cache.put(ctv_session.id, ctv_session.campaign_id, ctv_session.status, ctv_session.expires_at)
+        return ctv_session.expires_at
+
+    async def _publish_interaction(self, interaction: Interaction) -> InteractionResponse:
+        response = InteractionResponse(
+            id=interaction.id,
+            session_id=interaction.session_id,
+            action_type=interaction.action_type,
+            payload=interaction.payload or {},
+            created_at=interaction.created_at,
         )
+        event = {"event": "interaction", **response.model_dump(mode="json")}
+        await after_commit(self.session, lambda: ws_manager.send_to_session(str(interaction.session_id), event))
+        return response
 
     async def handle_interaction(
         self,
@@ -163,45 +265,248 @@ class SessionService:
         interaction_token: str,
     ) -> InteractionResponse:
         self._verify_interaction_token(interaction_token, session_id)
+        await self._ensure_session_paired(session_id)
 
-        ctv_session = get_ctv_session_by_id(session_id, self.session)
-        if not ctv_session:
-            raise SessionNotFoundException(session_id)
+        if settings.INTERACTION_INGESTION_MODE == "batched":
+            interaction = interaction_ingestor.submit(
+                session_id=session_id,
+                action_type=interaction_data.action_type,
+                payload=interaction_data.payload,
+            )
+        else:
+            interaction = await create_interaction_async(
+                session_id=session_id,
+                action_type=interaction_data.action_type,
+                payload=interaction_data.payload,
+                db=self.session,
+            )
 
-        self._check_session_expiry(ctv_session)
+        return await self._publish_interaction(interaction)
 
-        if ctv_session.status != SessionStatus.paired:
-            raise SessionNotPairedException(session_id)
+    async def handle_interaction_batch(
+        self,
+        session_id: uuid.UUID,
+        items: list[dict[str, Any]],
+        interaction_token: str,
+    ) -> InteractionBatchResponse:
+        """Token and session are checked once for the whole batch. Items are validated
+        individually and the valid ones written with one multi-row INSERT (or queued,
+        in batched ingestion mode, where a full queue rejects the remaining items)."""
+        if len(items) > settings.INTERACTION_BATCH_MAX_ITEMS:
+            raise InteractionBatchTooLargeException(settings.INTERACTION_BATCH_MAX_ITEMS)
 
-        interaction = create_interaction(
+        self._verify_interaction_token(interaction_token, session_id)
+        await self._ensure_session_paired(session_id)
+
+        results: list[InteractionBatchItemResult] = []
+        valid: list[tuple[int, InteractionCreate]] = []
+        for index, item in enumerate(items):
+            try:
+                valid.append((index, InteractionCreate.model_validate(item)))
+            except ValidationError as exc:
+                error = "; ".join(f"{'.'.join(map(str, e['loc']))}: {e['msg']}" for e in exc.errors())
+                results.append(InteractionBatchItemResult(index=index, accepted=False, error=error))
+
+        accepted: list[tuple[int, Interaction]] = []
+        if settings.INTERACTION_INGESTION_MODE == "batched":
+            for index, data in valid:
+                try:
+                    accepted.append((index, interaction_ingestor.submit(session_id, data.action_type, data.payload)))
+                except InteractionQueueFullException as exc:
+                    results.append(InteractionBatchItemResult(index=index, accepted=False, error=exc.detail))
+        elif valid:
+            created = await create_interactions_async(
+                session_id,
+                [(data.action_type, data.payload) for _, data in valid],
+                self.session,
+            )
+            accepted = [(index, interaction) for (index, _), interaction in zip(valid, created)]
+
+        for index, interaction in accepted:
+            response = await self._publish_interaction(interaction)
+            results.append(InteractionBatchItemResult(index=index, accepted=True, interaction=response))
+
+        results.sort(key=lambda result: result.index)
+        return InteractionBatchResponse(
+            accepted=len(accepted),
+            rejected=len(results) - len(accepted),
+            results=results,
+        )
+
+    async def open_phone_channel(self, session_id: uuid.UUID, interaction_token: str) -> datetime | None:
+        """Admission check for the phone WebSocket; returns when the session expires."""
+        self._verify_interaction_token(interaction_token, session_id)
+        return await self._ensure_session_paired(session_id)
+
+    async def relay_interaction(
+        self,
+        session_id: uuid.UUID,
+        interaction_data: InteractionCreate,
+    ) -> InteractionResponse:
+        """Phone WebSocket path: the session was checked when the socket was admitted,
+        so the interaction goes straight to the CTV and is persisted write-behind."""
+        interaction = interaction_ingestor.submit(
             session_id=session_id,
             action_type=interaction_data.action_type,
             payload=interaction_data.payload,
-            db=self.session,
         )
+        return await self._publish_interaction(interaction)
 
-        return InteractionResponse(
-            id=interaction.id,
-            session_id=interaction.session_id,
-            action_type=interaction.action_type,
-            payload=interaction.payload or {},
-            created_at=interaction.created_at,
+    async def list_interactions(
+        self,
+        session_id: uuid.UUID,
+        token: str,
+        after: str | None,
+        limit: int,
+    ) -> InteractionPage:
+        """Interactions newer than `after`, for the phone (interaction token) or the CTV
+        (ctv token). An empty page echoes the cursor back so the caller keeps polling from it."""
+        self._verify_session_token(token, session_id, (INTERACTION_TOKEN_TYPE, CTV_TOKEN_TYPE))
+
+        until = datetime.now() - timedelta(milliseconds=settings.INTERACTION_CURSOR_SETTLE_MS)
+        rows = await get_interactions_after_async(
+            session_id,
+            decode_cursor(after) if after else None,
+            until,
+            limit,
+            self.session,
         )
-
-    def get_session_status(self, session_id: uuid.UUID) -> CTVSessionStatusResponse:
-        ctv_session = get_ctv_session_by_id(session_id, self.session)
+        items = [
+            InteractionResponse(
+                id=row.id,
+                session_id=row.session_id,
+                action_type=row.action_type,
+                payload=row.payload or {},
+                created_at=row.created_at,
+            )
+            for row in rows
+        ]
+        next_cursor = after
+        if rows:
+            next_cursor = encode_cursor(rows[-1].created_at, rows[-1].id)
+        return InteractionPage(items=items, next_cursor=next_cursor)
+
+    async def open_event_stream(
+        self,
+        session_id: uuid.UUID,
+        token: str,
+        last_event_id: str | None,
+    ) -> AsyncIterator[str]:
+        """Validate the request and return the SSE body for the session.
+
+        Live events come from the in-process event source; a `Last-Event-ID`
+        (an interaction cursor) first replays what was missed from the table.
+        The DB connection is released before streaming starts.
+
+        Rows can commit or be published out of created_at order, so ones just
+        older than the cursor may never have reached the client. The replay
+        therefore starts INTERACTION_CURSOR_SETTLE_MS before the cursor, and
+        may resend interactions the client already has: clients dedupe by id.
+        """
+        self._verify_session_token(token, session_id, (CTV_TOKEN_TYPE, INTERACTION_TOKEN_TYPE))
+        ctv_session = await get_ctv_session_by_id_async(session_id, self.session)
         if not ctv_session:
             raise SessionNotFoundException(session_id)
 
-        if ctv_session.expires_at and datetime.now() > ctv_session.expires_at:
-            if ctv_session.status not in (SessionStatus.expired, SessionStatus.closed):
-                update_session_status(ctv_session, SessionStatus.expired, self.session)
-                ctv_session.status = SessionStatus.expired
+        # Subscribe before the replay read so nothing accepted in between is lost
+        subscription = event_streams.subscribe(str(session_id))
+        try:
+            replay: list[Interaction] = []
+            if last_event_id:
+                cursor_created_at, _ = decode_cursor(last_event_id)
+                settle = timedelta(milliseconds=settings.INTERACTION_CURSOR_SETTLE_MS)
+                replay = await get_interactions_after_async(
+                    session_id,
+                    (cursor_created_at - settle, uuid.UUID(int=0)),
+                    datetime.now(),
+                    settings.SSE_REPLAY_LIMIT,
+                    self.session,
+                )
+            await self.session.close()
+        except BaseException:
+            event_streams.unsubscribe(str(session_id), subscription)
+            raise
+        return self._event_stream(ctv_session, subscription, replay)
+
+    async def _event_stream(
+        self,
+        ctv_session: CTVSession,
+        subscription: Subscription,
+        replay: list[Interaction],
+    ) -> AsyncIterator[str]:
+        try:
+            yield format_sse("status", {"status": self._effective_status(ctv_session).value})
+
+            replayed: set[str] = set()
+            for row in replay:
+                replayed.add(str(row.id))
+                event = InteractionResponse(
+                    id=row.id,
+                    session_id=row.session_id,
+                    action_type=row.action_type,
+                    payload=row.payload or {},
+                    created_at=row.created_at,
+                ).model_dump(mode="json")
+                cursor = encode_cursor(row.created_at, row.id)
+                yield format_sse("interaction", {"event": "interaction", **event}, cursor)
+
+            while not subscription.dropped:
+                timeout = settings.SSE_HEARTBEAT_SECONDS
+                if ctv_session.expires_at:
+                    remaining = (ctv_session.expires_at - datetime.now()).total_seconds()
+                    if remaining <= 0:
+                        yield format_sse("status", {"status": SessionStatus.expired.value})
+                        return
+                    timeout = min(timeout, remaining)
+                try:
+                    message = await asyncio.wait_for(subscription.queue.get(), timeout)
+                except TimeoutError:
+                    # SSE comment line: keeps proxies from closing an idle stream
+                    yield ": ping\n\n"
+                    continue
+
+                event_name = message.get("event", "message")
+                cursor = None
+                if event_name == "interaction":
+                    if message.get("id") in replayed:
+                        continue
+                    cursor = encode_cursor(datetime.fromisoformat(message["created_at"]), uuid.UUID(message["id"]))
+                yield format_sse(event_name, message, cursor)
+        finally:
+            event_streams.unsubscribe(str(ctv_session.id), subscription)
+
+    async def get_session_status(
+        self,
+        session_id: uuid.UUID,
+        wait: float = 0,
+        known_status: SessionStatus | None = None,
+    ) -> CTVSessionStatusResponse:
+        """With `wait` and `known_status`, park until the status differs from
+        `known_status` (claim or expiry) or `wait` seconds elapse."""
+        # Registered before the read so a claim landing in between is not missed
+        waiter = status_waiters.register(str(session_id)) if wait > 0 and known_status else None
+        try:
+            ctv_session = await get_ctv_session_by_id_async(session_id, self.session)
+            if not ctv_session:
+                raise SessionNotFoundException(session_id)
+
+            status = self._effective_status(ctv_session)
+            if waiter is not None and status == known_status and status in LIVE_STATUSES:
+                # Give the connection back to the pool while parked
+                await self.session.close()
+                timeout = float(wait)
+                if ctv_session.expires_at:
+                    timeout = min(timeout, max(0.0, (ctv_session.expires_at - datetime.now()).total_seconds()))
+                await asyncio.wait({waiter}, timeout=timeout)
+                status = waiter.result() if waiter.done() else self._effective_status(ctv_session)
+        finally:
+            if waiter is not None:
+                status_waiters.unregister(str(session_id), waiter)
 
         return CTVSessionStatusResponse(
             id=ctv_session.id,
             campaign_id=ctv_session.campaign_id,
-            status=ctv_session.status,
+            status=status,
             created_at=ctv_session.created_at,
             expires_at=ctv_session.expires_at,
         )
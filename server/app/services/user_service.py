@@ -1,37 +1,51 @@
 from __future__ import annotations
 
 from datetime import datetime, timedelta, timezone
+from typing import Any, Optional
 
 from app.core.exceptions import (
+    PasswordHashingBusyException,
     UserCredentialsException,
     UserEmailAlreadyExistsException,
     UserNotFoundException,
     UsernameAlreadyExistsException,
 )
 from app.core.config import settings
+from app.core.pagination import decode_cursor, page
+from app.core.password_hashing import password_hasher, password_rehashed
 from app.crud.user_crud import (
     create_user,
     delete_user,
     get_user_by_email,
     get_user_by_username,
     get_user_hashed_password,
+    get_users_page,
+    replace_password_hash_async,
     update_user,
 )
 
+from fastapi import BackgroundTasks
 import jwt
 from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
+from starlette.concurrency import run_in_threadpool
+from app.db import async_engine
 from app.models.user import UserCreate, UserCreateHashed, UserResponse, UserUpdate
-from argon2 import PasswordHasher
 
-ph = PasswordHasher()
 
+async def upgrade_password_hash(email: str, stale_hash: str, password: str) -> None:
+    """Rehash a password with the current argon2 costs, after the login response is sent.
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return ph.verify(hashed_password, plain_password)
-
-
-def get_password_hash(plain_password: str) -> str:
-    return ph.hash(plain_password)
+    Best effort: when the hashing pool is busy, the next login tries again.
+    """
+    try:
+        new_hash = await password_hasher.hash(password)
+    except PasswordHashingBusyException:
+        return
+    async with AsyncSession(async_engine) as db, db.begin():
+        upgraded = await replace_password_hash_async(email, stale_hash, new_hash, db)
+    if upgraded:
+        password_rehashed.inc()
 
 
 class UserService:
@@ -57,31 +71,43 @@ class UserService:
         to_encode.update({"exp": expire})
         return jwt.encode(to_encode, self.jwt_secret_key, algorithm=self.jwt_algorithm)
 
-    def authenticate_user(self, email: str, password: str):
-        user = get_user_hashed_password(email, self.session)
+    def list_users(self, after: Optional[str], limit: int) -> dict[str, Any]:
+        """UserPage shape: oldest first, `next_cursor` is None on the last page."""
+        rows = get_users_page(decode_cursor(after) if after else None, limit, self.session)
+        rows, next_cursor = page(rows, limit)
+        return {
+            "items": [{"email": row.email, "username": row.username, "bio": row.bio} for row in rows],
+            "next_cursor": next_cursor,
+        }
+
+    async def authenticate_user(self, email: str, password: str, background_tasks: BackgroundTasks):
+        # Called from async routes: DB work goes to the threadpool, argon2 to its own pool
+        user = await run_in_threadpool(get_user_hashed_password, email, self.session)
         if not user:
             raise UserNotFoundException(email)
-        if not verify_password(password, user.hashed_password):
+        if not await password_hasher.verify(user.hashed_password, password):
             raise UserCredentialsException()
+        if password_hasher.needs_rehash(user.hashed_password):
+            background_tasks.add_task(upgrade_password_hash, user.email, user.hashed_password, password)
         return user
 
-    def create_user(self, user_data: UserCreate):
-        db_user = get_user_by_email(user_data.email, self.session)
-        db_user_by_username = get_user_by_username(user_data.username, self.session)
+    async def create_user(self, user_data: UserCreate):
+        db_user = await run_in_threadpool(get_user_by_email, user_data.email, self.session)
+        db_user_by_username = await run_in_threadpool(get_user_by_username, user_data.username, self.session)
 
         if db_user:
             raise UserEmailAlreadyExistsException(user_data.email)
         if db_user_by_username:
             raise UsernameAlreadyExistsException(user_data.username)
 
-        hashed_password = get_password_hash(user_data.plain_password)
+        hashed_password = await password_hasher.hash(user_data.plain_password)
         new_user = UserCreateHashed(
             email=user_data.email,
             username=user_data.username,
             bio=user_data.bio,
             hashed_password=hashed_password,
         )
-        return create_user(new_user, self.session)
+        return await run_in_threadpool(create_user, new_user, self.session)
 
     def update_user_data(self, user_update: UserUpdate, current_user: UserResponse):
         if user_update.username:
@@ -95,4 +121,3 @@ class UserService:
         deleted = delete_user(current_user.email, self.session)
         if not deleted:
             raise UserNotFoundException(current_user.email)
-        self.session.commit()
@@ -1,20 +1,26 @@
-from typing import List
+from typing import Any, Optional
 from sqlmodel import Session
+from app.core.pagination import decode_cursor, page
 from app.crud.vote_crud import (
     create_vote,
-    get_all_votes,
+    get_votes_page,
 )
 from app.models import Vote
-from app.models.vote import Role, VoteResponse
+from app.models.vote import Role
 
 class VoteService:
     def __init__(self, session: Session):
         self.session = session
 
-    def get_all_votes(self) -> List[VoteResponse]:
-        votes = get_all_votes(self.session)
-        return [VoteResponse(**v.model_dump()) for v in votes]
+    def list_votes(self, after: Optional[str], limit: int) -> dict[str, Any]:
+        """VotePage shape: oldest first, `next_cursor` is None on the last page."""
+        rows = get_votes_page(decode_cursor(after) if after else None, limit, self.session)
+        rows, next_cursor = page(rows, limit)
+        return {
+            "items": [{"role": row.role, "created_at": row.created_at} for row in rows],
+            "next_cursor": next_cursor,
+        }
 
-    def create_vote(self, role: Role) -> VoteResponse:
+    def create_vote(self, role: Role) -> dict[str, Any]:
         created = create_vote(Vote(role=role), self.session)
-        return VoteResponse(**created.model_dump())
\ No newline at end of file
+        return {"role": created.role, "created_at": created.created_at}
\ No newline at end of file
@@ -0,0 +1,112 @@
+"""Claim latency under concurrency.
+
+Registers a batch of CTV sessions, then fires all the claims concurrently while a
+probe keeps hitting `GET /`. The probe latency shows whether the event loop is
+being stalled by the claim path (a blocking DB call shows up as a probe p99 in
+the same range as the claim p99).
+
+    pip install -r benchmarks/requirements.txt
+    uvicorn app.main:app --port 8000 &
+    python -m benchmarks.claim_latency --sessions 500 --concurrency 100
+"""
+import argparse
+import asyncio
+import time
+import uuid
+
+import httpx
+
+from benchmarks.common import emit, summarize
+
+API = "/api/v1"
+
+
+async def create_campaign(client: httpx.AsyncClient) -> str:
+    response = await client.post(
+        f"{API}/campaign/",
+        json={
+            "name": f"bench-{uuid.uuid4().hex[:8]}",
+            "qr_base_url": "https://example.com/landing",
+            "interaction_config": [{"action_type": "tap", "label": "Tap"}],
+        },
+    )
+    response.raise_for_status()
+    return response.json()["id"]
+
+
+async def register(client: httpx.AsyncClient, campaign_id: str, sem: asyncio.Semaphore) -> str:
+    async with sem:
+        response = await client.post(f"{API}/session/register", json={"campaign_id": campaign_id})
+        response.raise_for_status()
+        return response.json()["claim_token"]
+
+
+async def claim(
+    client: httpx.AsyncClient,
+    claim_token: str,
+    sem: asyncio.Semaphore,
+    latencies: list[float],
+    errors: dict[int, int],
+) -> None:
+    async with sem:
+        start = time.perf_counter()
+        response = await client.post(f"{API}/session/claim", json={"claim_token": claim_token})
+        latencies.append((time.perf_counter() - start) * 1000)
+        if response.status_code != 200:
+            errors[response.status_code] = errors.get(response.status_code, 0) + 1
+
+
+async def probe(client: httpx.AsyncClient, interval: float, stop: asyncio.Event, latencies: list[float]) -> None:
+    while not stop.is_set():
+        start = time.perf_counter()
+        await client.get("/")
+        latencies.append((time.perf_counter() - start) * 1000)
+        await asyncio.sleep(interval)
+
+
+async def run(args: argparse.Namespace) -> dict:
+    limits = httpx.Limits(max_connections=args.concurrency + 1)
+    async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=60) as client:
+        campaign_id = await create_campaign(client)
+        sem = asyncio.Semaphore(args.concurrency)
+        tokens = await asyncio.gather(*(register(client, campaign_id, sem) for _ in range(args.sessions)))
+
+        claim_latencies: list[float] = []
+        probe_latencies: list[float] = []
+        errors: dict[int, int] = {}
+        stop = asyncio.Event()
+        probe_task = asyncio.create_task(probe(client, args.probe_interval, stop, probe_latencies))
+
+        start = time.perf_counter()
+        await asyncio.gather(*(claim(client, t, sem, claim_latencies, errors) for t in tokens))
+        elapsed = time.perf_counter() - start
+
+        stop.set()
+        await probe_task
+
+    return {
+        "benchmark": "claim_latency",
+        "base_url": args.base_url,
+        "sessions": args.sessions,
+        "concurrency": args.concurrency,
+        "elapsed_s": round(elapsed, 3),
+        "claims_per_s": round(args.sessions / elapsed, 1) if elapsed else 0.0,
+        "claim": summarize(claim_latencies),
+        "probe": summarize(probe_latencies),
+        "errors": errors,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--sessions", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--probe-interval", type=float, default=0.01, help="seconds between loop probes")
+    parser.add_argument("--output", help="write the JSON report here instead of stdout")
+    args = parser.parse_args()
+    emit(asyncio.run(run(args)), args.output)
+
+
+if __name__ == "__main__":
+    main()
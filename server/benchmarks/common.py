@@ -0,0 +1,94 @@
+import asyncio
+import json
+import math
+import os
+import re
+import subprocess
+import sys
+import time
+from typing import Any, Optional
+
+import httpx
+
+
+def percentile(sorted_values: list[float], pct: float) -> float:
+    """Nearest-rank percentile over an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def summarize(latencies_ms: list[float]) -> dict[str, float]:
+    values = sorted(latencies_ms)
+    return {
+        "count": len(values),
+        "p50_ms": round(percentile(values, 50), 3),
+        "p95_ms": round(percentile(values, 95), 3),
+        "p99_ms": round(percentile(values, 99), 3),
+        "max_ms": round(values[-1], 3) if values else 0.0,
+    }
+
+
+def emit(report: dict[str, Any], output: Optional[str]) -> None:
+    """Write the report as JSON to `output`, or to stdout when not given."""
+    text = json.dumps(report, indent=2, default=str)
+    if output:
+        with open(output, "w") as f:
+            f.write(text + "\n")
+    else:
+        sys.stdout.write(text + "\n")
+
+
+def start_server(port: int, env: dict[str, str], workers: int = 1) -> subprocess.Popen:
+    """Run the app under uvicorn with `env` on top of the current environment."""
+    command = [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"]
+    if workers > 1:
+        command += ["--workers", str(workers)]
+    return subprocess.Popen(
+        command,
+        env={"JWT_SECRET_KEY": "bench-secret", **os.environ, **env},
+    )
+
+
+async def wait_ready(client: httpx.AsyncClient, timeout: float = 30) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if (await client.get("/")).status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        await asyncio.sleep(0.2)
+    raise RuntimeError("server did not become ready")
+
+
+async def scrape_metrics(client: httpx.AsyncClient) -> dict[str, float]:
+    """`GET /metrics` parsed into {sample name (with labels): value}."""
+    samples = {}
+    for line in (await client.get("/metrics")).text.splitlines():
+        if line and not line.startswith("#"):
+            name, _, value = line.rpartition(" ")
+            samples[name] = float(value)
+    return samples
+
+
+def histogram_delta(before: dict[str, float], after: dict[str, float], metric: str) -> dict[str, Optional[float]]:
+    """Count, mean and p99 upper bound (the bucket bound it falls under) of the
+    observations a histogram recorded between two scrapes, over all its label sets."""
+    buckets: dict[float, float] = {}
+    total = 0.0
+    for name, value in after.items():
+        base, _, labels = name.partition("{")
+        delta = value - before.get(name, 0)
+        if base == f"{metric}_bucket":
+            bound = re.search(r'le="([^"]+)"', labels).group(1)
+            le = float("inf") if bound == "+Inf" else float(bound)
+            buckets[le] = buckets.get(le, 0) + delta
+        elif base == f"{metric}_sum":
+            total += delta
+    count = buckets.get(float("inf"), 0)
+    if not count:
+        return {"count": 0, "mean_ms": None, "p99_ms_le": None}
+    p99 = next(bound for bound, cumulative in sorted(buckets.items()) if cumulative >= 0.99 * count)
+    return {"count": int(count), "mean_ms": round(total / count * 1000, 3), "p99_ms_le": p99 * 1000}
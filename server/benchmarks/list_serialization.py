@@ -0,0 +1,191 @@
+"""List endpoint throughput: response_model serialization vs pre-shaped rows.
+
+The list endpoints used to load ORM objects, build a pydantic response model
+per row, and then let FastAPI validate and serialize the list again through
+`response_model`. They now select only the response columns, map each row to
+a dict once, and return an ORJSONResponse. That response bypasses the
+response_model pass.
+
+This runs both paths in-process over the ASGI interface, so there is no
+network or uvicorn in the numbers. The old path is `/before/...`, rebuilt
+here as it was but with the same keyset page, so both serialize the same
+rows. The new path is `/after/...`, the app's own routers. Both read the same
+seeded SQLite file. The script also checks that the two paths return the same
+JSON.
+
+`after_last_page` times the new path on the page that ends the table. With
+the (created_at, id) index it should match the first page at any `--rows`.
+
+    python -m benchmarks.list_serialization --rows 1000 --limit 500 --duration 5
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from typing import Optional
+
+DB_PATH = os.path.join(tempfile.gettempdir(), "list_serialization.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{DB_PATH}"
+os.environ.setdefault("JWT_SECRET_KEY", "bench-secret")
+
+import httpx  # noqa: E402
+from fastapi import APIRouter, Depends, FastAPI, Query  # noqa: E402
+from sqlmodel import Session, SQLModel, select  # noqa: E402
+
+from app.db import engine, get_session  # noqa: E402
+from app.models import Campaign, User, Vote  # noqa: E402
+from app.core.pagination import decode_cursor, encode_cursor, keyset  # noqa: E402
+from app.models.campaign import CampaignPage, CampaignResponse  # noqa: E402
+from app.models.user import UserPage, UserResponse  # noqa: E402
+from app.models.vote import Role, VotePage, VoteResponse  # noqa: E402
+from app.routes import campaign, user, vote  # noqa: E402
+from benchmarks.common import emit, summarize  # noqa: E402
+
+ENDPOINTS = ("/campaign/", "/vote/", "/user/")
+
+legacy = APIRouter()
+
+
+def legacy_page(session: Session, model, after: Optional[str], limit: int) -> tuple[list, Optional[str]]:
+    """Whole ORM objects, as the list endpoints used to load them."""
+    query = keyset(select(model), model.created_at, model.id, decode_cursor(after) if after else None, limit)
+    rows = list(session.exec(query).all())
+    if len(rows) <= limit:
+        return rows, None
+    return rows[:limit], encode_cursor(rows[limit - 1].created_at, rows[limit - 1].id)
+
+
+@legacy.get("/campaign/", response_model=CampaignPage)
+def legacy_campaigns(
+    after: Optional[str] = None,
+    limit: int = Query(default=100),
+    session: Session = Depends(get_session),
+):
+    rows, next_cursor = legacy_page(session, Campaign, after, limit)
+    items = [
+        CampaignResponse(
+            id=c.id,
+            name=c.name,
+            description=c.description,
+            interaction_config=c.interaction_config or [],
+            qr_base_url=c.qr_base_url,
+            is_active=c.is_active,
+            created_at=c.created_at,
+        )
+        for c in rows
+    ]
+    return CampaignPage(items=items, next_cursor=next_cursor)
+
+
+@legacy.get("/vote/", response_model=VotePage)
+def legacy_votes(
+    after: Optional[str] = None,
+    limit: int = Query(default=100),
+    session: Session = Depends(get_session),
+):
+    rows, next_cursor = legacy_page(session, Vote, after, limit)
+    return VotePage(items=[VoteResponse(**v.model_dump()) for v in rows], next_cursor=next_cursor)
+
+
+@legacy.get("/user/", response_model=UserPage)
+def legacy_users(
+    after: Optional[str] = None,
+    limit: int = Query(default=100),
+    session: Session = Depends(get_session),
+):
+    rows, next_cursor = legacy_page(session, User, after, limit)
+    return UserPage(items=[UserResponse.model_validate(u) for u in rows], next_cursor=next_cursor)
+
+
+def build_app() -> FastAPI:
+    app = FastAPI()
+    app.include_router(legacy, prefix="/before")
+    for module in (campaign, vote, user):
+        app.include_router(module.router, prefix="/after")
+    return app
+
+
+def seed(rows: int) -> None:
+    if os.path.exists(DB_PATH):
+        os.remove(DB_PATH)
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        for i in range(rows):
+            session.add(
+                Campaign(
+                    name=f"campaign-{i}",
+                    description="Seeded for the list serialization benchmark",
+                    qr_base_url="https://example.com/landing",
+                    interaction_config=[{"action_type": "tap", "label": "Tap"}, {"action_type": "swipe"}],
+                )
+            )
+            session.add(Vote(role=Role.villageois if i % 2 else Role.loups_garous))
+            session.add(User(email=f"user-{i}@example.com", username=f"user-{i}", bio="bio", hashed_password="x"))
+        session.commit()
+
+
+async def measure(client: httpx.AsyncClient, path: str, duration: float) -> dict:
+    latencies = []
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        response = await client.get(path)
+        latencies.append((time.perf_counter() - started) * 1000)
+        response.raise_for_status()
+    return {**summarize(latencies), "throughput_rps": round(len(latencies) / duration, 1)}
+
+
+def last_page_cursor(model, rows: int, limit: int) -> Optional[str]:
+    """Cursor of the row `limit` rows before the end of the table."""
+    if rows <= limit:
+        return None
+    with Session(engine) as session:
+        row = session.exec(
+            select(model.created_at, model.id).order_by(model.created_at, model.id).offset(rows - limit - 1).limit(1)
+        ).one()
+    return encode_cursor(row.created_at, row.id)
+
+
+async def run(rows: int, limit: int, duration: float) -> dict:
+    transport = httpx.ASGITransport(app=build_app())
+    endpoints = {}
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for endpoint, model in zip(ENDPOINTS, (Campaign, Vote, User)):
+            query = f"{endpoint}?limit={limit}"
+            before = (await client.get(f"/before{query}")).json()
+            after = (await client.get(f"/after{query}")).json()
+            if before != after:
+                raise SystemExit(f"{endpoint}: responses differ between the two paths")
+
+            results = {}
+            for variant in ("before", "after"):
+                results[variant] = await measure(client, f"/{variant}{query}", duration)
+            results["speedup"] = round(results["after"]["throughput_rps"] / results["before"]["throughput_rps"], 2)
+            cursor = last_page_cursor(model, rows, limit)
+            if cursor:
+                results["after_last_page"] = await measure(client, f"/after{query}&after={cursor}", duration)
+            endpoints[f"GET {endpoint}"] = results
+    return {
+        "benchmark": "list_serialization",
+        "rows": rows,
+        "limit": limit,
+        "duration_s": duration,
+        "endpoints": endpoints,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1000, help="rows per table")
+    parser.add_argument("--limit", type=int, default=500, help="page size requested (the API allows up to 500)")
+    parser.add_argument("--duration", type=float, default=5.0, help="seconds per endpoint and variant")
+    parser.add_argument("--output", help="write the JSON report here instead of stdout")
+    args = parser.parse_args()
+
+    seed(args.rows)
+    emit(asyncio.run(run(args.rows, args.limit, args.duration)), args.output)
+
+
+if __name__ == "__main__":
+    main()
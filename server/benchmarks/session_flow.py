@@ -0,0 +1,255 @@
+"""End-to-end load generator for the register -> claim -> interact flow.
+
+Replays ad breaks described by a scenario file (see benchmarks/scenarios/):
+
+- At the start of each break, `ctvs_per_break` CTVs call /session/register,
+  spread over `register_ramp_seconds`.
+- A `claim_fraction` of them get claimed by a phone `claim_delay_seconds`
+  later. Keep the delay under the 120 s session window, or claims fail with
+  410.
+- Each phone then sends `interactions_per_phone` interactions,
+  `interaction_interval_ms` apart.
+
+All [min, max] pairs are drawn uniformly. `concurrency` caps the requests in
+flight.
+
+The report has, per endpoint:
+- throughput
+- p50/p95/p99 latency
+- errors, keyed by the `app/core/exceptions.py` class that produced them
+
+It also has the DB pool checkout time that the server recorded during the run
+(`db_pool_wait_seconds`). With several workers, that histogram is per worker
+and the scrape reaches only one of them.
+
+    pip install -r benchmarks/requirements.txt
+    uvicorn app.main:app --port 8000 &
+    python -m benchmarks.session_flow --scenario benchmarks/scenarios/ad_break.json
+
+    # or let it start the server itself
+    python -m benchmarks.session_flow --start-server --database-url sqlite:////tmp/flow.db
+"""
+import argparse
+import asyncio
+from collections import Counter
+from dataclasses import dataclass, fields
+import inspect
+import json
+import os
+import random
+import re
+import time
+from typing import Any, Optional
+
+import httpx
+
+from app.core.exceptions import AppException
+from benchmarks.common import emit, histogram_delta, scrape_metrics, start_server, summarize, wait_ready
+
+API = "/api/v1"
+SCENARIO_DIR = os.path.join(os.path.dirname(__file__), "scenarios")
+
+
+@dataclass
+class Scenario:
+    name: str = "default"
+    campaigns: int = 1
+    ad_breaks: int = 1
+    break_interval_seconds: float = 30
+    ctvs_per_break: int = 1000
+    register_ramp_seconds: float = 5
+    claim_fraction: float = 0.25
+    claim_delay_seconds: tuple[float, float] = (3, 60)
+    interactions_per_phone: tuple[int, int] = (3, 20)
+    interaction_interval_ms: tuple[float, float] = (150, 1500)
+    concurrency: int = 200
+
+    @classmethod
+    def load(cls, path: str) -> "Scenario":
+        with open(path) as f:
+            data = json.load(f)
+        known = {field.name for field in fields(cls)}
+        unknown = set(data) - known
+        if unknown:
+            raise ValueError(f"Unknown scenario keys: {', '.join(sorted(unknown))}")
+        return cls(**{key: tuple(value) if isinstance(value, list) else value for key, value in data.items()})
+
+
+class ErrorClassifier:
+    """Maps an error response back to the AppException subclass that produced it.
+
+    Every subclass has a fixed `detail` template. Building each one with
+    placeholder arguments gives a pattern to match the `error` field against.
+    Anything else is reported by status code.
+    """
+
+    PLACEHOLDER = "\x00"
+
+    def __init__(self):
+        self.patterns: list[tuple[int, re.Pattern, str]] = []
+        for cls in AppException.__subclasses__():
+            arity = len(inspect.signature(cls.__init__).parameters) - 1
+            try:
+                exc = cls(*[self.PLACEHOLDER] * arity)
+            except Exception:
+                continue
+            regex = ".*".join(re.escape(part) for part in exc.detail.split(self.PLACEHOLDER))
+            self.patterns.append((exc.status_code, re.compile(f"^{regex}$", re.DOTALL), cls.__name__))
+        # Most specific (longest literal) templates first
+        self.patterns.sort(key=lambda p: len(p[1].pattern), reverse=True)
+
+    def classify(self, response: httpx.Response) -> str:
+        try:
+            error = response.json().get("error")
+        except (ValueError, AttributeError):
+            error = None
+        if isinstance(error, str):
+            for status_code, pattern, name in self.patterns:
+                if status_code == response.status_code and pattern.match(error):
+                    return name
+        return f"HTTP {response.status_code}"
+
+
+class Recorder:
+    def __init__(self, client: httpx.AsyncClient, concurrency: int):
+        self.client = client
+        self.sem = asyncio.Semaphore(concurrency)
+        self.classifier = ErrorClassifier()
+        self.latencies: dict[str, list[float]] = {}
+        self.errors: dict[str, Counter] = {}
+
+    async def call(self, endpoint: str, method: str, path: str, **kwargs) -> Optional[dict[str, Any]]:
+        """One request, timed from send to response (client-side queueing excluded).
+        Returns the JSON body on success, None otherwise."""
+        latencies = self.latencies.setdefault(endpoint, [])
+        errors = self.errors.setdefault(endpoint, Counter())
+        async with self.sem:
+            started = time.perf_counter()
+            try:
+                response = await self.client.request(method, f"{API}{path}", **kwargs)
+            except httpx.HTTPError as exc:
+                errors[type(exc).__name__] += 1
+                return None
+            latencies.append((time.perf_counter() - started) * 1000)
+        if response.status_code >= 400:
+            errors[self.classifier.classify(response)] += 1
+            return None
+        return response.json()
+
+
+async def ctv_flow(recorder: Recorder, scenario: Scenario, campaign_id: str, start_delay: float) -> None:
+    await asyncio.sleep(start_delay)
+    registration = await recorder.call("register", "POST", "/session/register", json={"campaign_id": campaign_id})
+    if registration is None or random.random() >= scenario.claim_fraction:
+        return
+
+    await asyncio.sleep(random.uniform(*scenario.claim_delay_seconds))
+    claim = await recorder.call("claim", "POST", "/session/claim", json={"claim_token": registration["claim_token"]})
+    if claim is None:
+        return
+
+    headers = {"Authorization": f"Bearer {claim['interaction_token']}"}
+    for i in range(random.randint(*scenario.interactions_per_phone)):
+        await recorder.call(
+            "interact",
+            "POST",
+            f"/session/interact/{registration['id']}",
+            json={"action_type": "tap", "payload": {"i": i}},
+            headers=headers,
+        )
+        await asyncio.sleep(random.uniform(*scenario.interaction_interval_ms) / 1000)
+
+
+async def create_campaigns(client: httpx.AsyncClient, count: int) -> list[str]:
+    ids = []
+    for i in range(count):
+        response = await client.post(
+            f"{API}/campaign/",
+            json={
+                "name": f"load-{i}",
+                "qr_base_url": "https://example.com/landing",
+                "interaction_config": [{"action_type": "tap", "label": "Tap"}],
+            },
+        )
+        response.raise_for_status()
+        ids.append(response.json()["id"])
+    return ids
+
+
+async def run(base_url: str, scenario: Scenario) -> dict:
+    limits = httpx.Limits(max_connections=scenario.concurrency, max_keepalive_connections=scenario.concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        await wait_ready(client)
+        campaign_ids = await create_campaigns(client, scenario.campaigns)
+        recorder = Recorder(client, scenario.concurrency)
+        before = await scrape_metrics(client)
+
+        started = time.perf_counter()
+        flows = [
+            ctv_flow(
+                recorder,
+                scenario,
+                random.choice(campaign_ids),
+                b * scenario.break_interval_seconds + random.uniform(0, scenario.register_ramp_seconds),
+            )
+            for b in range(scenario.ad_breaks)
+            for _ in range(scenario.ctvs_per_break)
+        ]
+        await asyncio.gather(*flows)
+        elapsed = time.perf_counter() - started
+
+        after = await scrape_metrics(client)
+
+    endpoints = {}
+    for name, latencies in recorder.latencies.items():
+        errors = recorder.errors.get(name, Counter())
+        endpoints[name] = {
+            **summarize(latencies),
+            "throughput_rps": round(len(latencies) / elapsed, 1),
+            "errors": dict(errors.most_common()),
+        }
+    total = sum(len(latencies) for latencies in recorder.latencies.values())
+    return {
+        "benchmark": "session_flow",
+        "scenario": scenario.name,
+        "duration_s": round(elapsed, 2),
+        "requests": total,
+        "throughput_rps": round(total / elapsed, 1),
+        "endpoints": endpoints,
+        "db_pool_wait": histogram_delta(before, after, "db_pool_wait_seconds"),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenario", default=os.path.join(SCENARIO_DIR, "ad_break.json"))
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--start-server", action="store_true", help="start uvicorn on --port instead of using --base-url")
+    parser.add_argument("--database-url", default=os.environ.get("DATABASE_URL", ""))
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--port", type=int, default=8012)
+    parser.add_argument("--seed", type=int, help="make the generated traffic reproducible")
+    parser.add_argument("--output", help="write the JSON report here instead of stdout")
+    args = parser.parse_args()
+
+    scenario = Scenario.load(args.scenario)
+    if args.seed is not None:
+        random.seed(args.seed)
+
+    if not args.start_server:
+        emit(asyncio.run(run(args.base_url, scenario)), args.output)
+        return
+
+    if not args.database_url:
+        parser.error("--start-server needs --database-url (or DATABASE_URL)")
+    server = start_server(args.port, {"DATABASE_URL": args.database_url}, args.workers)
+    try:
+        report = asyncio.run(run(f"http://127.0.0.1:{args.port}", scenario))
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+    emit(report, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+"""make created_at NOT NULL on keyset-paginated tables
+
+Revision ID: a7d4e2f9c6b1
+Revises: f3c9a1e6b8d2
+Create Date: 2026-10-18
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "a7d4e2f9c6b1"
+down_revision: Union[str, None] = "f3c9a1e6b8d2"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Lists over these tables page on (created_at, id): a NULL created_at drops the
+# row from every page after the first and cannot be encoded in a cursor
+TABLES = ("user", "campaign", "vote", "interaction")
+
+
+def upgrade() -> None:
+    for table in TABLES:
+        created_at = sa.column("created_at", sa.DateTime())
+        op.execute(sa.table(table, created_at).update().where(created_at.is_(None)).values(created_at=sa.func.now()))
+        op.alter_column(
+            table,
+            "created_at",
+            existing_type=sa.DateTime(),
+            nullable=False,
+            server_default=sa.func.now(),
+        )
+
+
+def downgrade() -> None:
+    for table in TABLES:
+        op.alter_column(
+            table,
+            "created_at",
+            existing_type=sa.DateTime(),
+            nullable=True,
+            server_default=None,
+        )
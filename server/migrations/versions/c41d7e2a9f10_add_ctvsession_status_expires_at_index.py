@@ -0,0 +1,31 @@
+"""add ctvsession (status, expires_at) index for the expiry sweeper
+
+Revision ID: c41d7e2a9f10
+Revises: 9b1a2c3d4e5f
+Create Date: 2026-10-18
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "c41d7e2a9f10"
+down_revision: Union[str, None] = "9b1a2c3d4e5f"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_ctvsession_status_expires_at",
+        "ctvsession",
+        ["status", "expires_at"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_ctvsession_status_expires_at", table_name="ctvsession")
@@ -0,0 +1,31 @@
+"""add interaction (session_id, created_at, id) index for cursor reads
+
+Revision ID: d8a3f61b2c57
+Revises: c41d7e2a9f10
+Create Date: 2026-10-18
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "d8a3f61b2c57"
+down_revision: Union[str, None] = "c41d7e2a9f10"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_interaction_session_id_created_at_id",
+        "interaction",
+        ["session_id", "created_at", "id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_interaction_session_id_created_at_id", table_name="interaction")
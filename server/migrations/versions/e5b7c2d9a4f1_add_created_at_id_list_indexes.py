@@ -0,0 +1,30 @@
+"""add (created_at, id) indexes for keyset-paginated lists
+
+Revision ID: e5b7c2d9a4f1
+Revises: d8a3f61b2c57
+Create Date: 2026-10-18
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "e5b7c2d9a4f1"
+down_revision: Union[str, None] = "d8a3f61b2c57"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLES = ("user", "campaign", "vote")
+
+
+def upgrade() -> None:
+    for table in TABLES:
+        op.create_index(f"ix_{table}_created_at_id", table, ["created_at", "id"], unique=False)
+
+
+def downgrade() -> None:
+    for table in TABLES:
+        op.drop_index(f"ix_{table}_created_at_id", table_name=table)
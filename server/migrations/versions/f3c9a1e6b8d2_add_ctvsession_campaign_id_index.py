@@ -0,0 +1,26 @@
+"""add ctvsession campaign_id index for campaign interaction exports
+
+Revision ID: f3c9a1e6b8d2
+Revises: e5b7c2d9a4f1
+Create Date: 2026-10-18
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "f3c9a1e6b8d2"
+down_revision: Union[str, None] = "e5b7c2d9a4f1"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_ctvsession_campaign_id", "ctvsession", ["campaign_id"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_ctvsession_campaign_id", table_name="ctvsession")
@@ -0,0 +1,40 @@
+import os
+import tempfile
+
+import anyio
+import pytest
+
+# Settings are read at import time, so this runs before any app module is imported
+DB_PATH = os.path.join(tempfile.mkdtemp(prefix="app-tests-"), "test.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{DB_PATH}"
+os.environ.setdefault("JWT_SECRET_KEY", "test-secret")
+# Cheapest argon2 costs the app allows: tests exercise the flow, not the hash strength
+os.environ.setdefault("PASSWORD_HASH_TIME_COST", "1")
+os.environ.setdefault("PASSWORD_HASH_MEMORY_KIB", "8192")
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+def postgres_url() -> str:
+    url = os.environ.get("TEST_DATABASE_URL")
+    if not url:
+        pytest.skip("TEST_DATABASE_URL is not set")
+    return url
+
+
+@pytest.fixture
+def tables():
+    """Empty tables for one test."""
+    from sqlmodel import SQLModel
+
+    from app.db import async_engine, engine
+
+    SQLModel.metadata.create_all(engine)
+    yield
+    # aiosqlite connections hold the file and a non-daemon thread each
+    anyio.run(async_engine.dispose)
+    SQLModel.metadata.drop_all(engine)
@@ -0,0 +1,70 @@
+import asyncio
+
+import pytest
+
+from app.core.broker import InMemoryBroker, PostgresBroker
+from app.core.ws_manager import ConnectionManager
+
+pytestmark = pytest.mark.anyio
+
+# Time for a LISTEN connection to come up, and for a stray NOTIFY to arrive
+SETTLE_SECONDS = 0.5
+
+
+async def test_in_memory_broker_delivers_once_to_every_listener():
+    manager = ConnectionManager(broker=InMemoryBroker())
+    first: list[tuple[str, dict]] = []
+    second: list[tuple[str, dict]] = []
+    manager.add_listener(lambda session_id, message: first.append((session_id, message)))
+    manager.add_listener(lambda session_id, message: second.append((session_id, message)))
+    await manager.start()
+    try:
+        delivered = await manager.send_to_session("s1", {"event": "paired"})
+    finally:
+        await manager.stop()
+
+    # No socket is attached in this process, the listeners still get the event
+    assert delivered is False
+    assert first == [("s1", {"event": "paired"})]
+    assert second == [("s1", {"event": "paired"})]
+
+
+async def test_in_memory_broker_drops_events_when_stopped():
+    broker = InMemoryBroker()
+    received: list[dict] = []
+    await broker.start(lambda session_id, message: received.append(message) or True)
+    await broker.stop()
+
+    assert await broker.publish("s1", {"event": "paired"}) is False
+    assert received == []
+
+
+async def wait_for(events: list, count: int, timeout: float = 5.0) -> None:
+    deadline = asyncio.get_running_loop().time() + timeout
+    while len(events) < count and asyncio.get_running_loop().time() < deadline:
+        await asyncio.sleep(0.02)
+
+
+@pytest.mark.postgres
+async def test_postgres_broker_fans_out_to_other_workers_without_echo(postgres_url):
+    worker_a, worker_b = PostgresBroker(postgres_url), PostgresBroker(postgres_url)
+    received_a: list[tuple[str, dict]] = []
+    received_b: list[tuple[str, dict]] = []
+    await worker_a.start(lambda session_id, message: received_a.append((session_id, message)) or True)
+    await worker_b.start(lambda session_id, message: received_b.append((session_id, message)) or False)
+    try:
+        await asyncio.sleep(SETTLE_SECONDS)
+        # More than one NOTIFY batch, each event distinct
+        events = [{"event": "interaction", "id": str(i)} for i in range(worker_a.batch_size + 20)]
+        for message in events:
+            assert await worker_a.publish("s1", message) is True
+        await wait_for(received_b, len(events))
+        await asyncio.sleep(SETTLE_SECONDS)
+    finally:
+        await worker_a.stop()
+        await worker_b.stop()
+
+    expected = [("s1", message) for message in events]
+    assert received_b == expected
+    # The publisher delivered locally once and ignored its own notifications
+    assert received_a == expected
@@ -0,0 +1,63 @@
+from datetime import datetime, timedelta
+import uuid
+
+import orjson
+import pytest
+from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.pagination import encode_cursor
+from app.db import async_engine, engine
+from app.models import Campaign, CTVSession, Interaction
+from app.services.session_service import SessionService
+
+pytestmark = pytest.mark.anyio
+
+
+def seed_session() -> uuid.UUID:
+    with Session(engine) as db:
+        campaign = Campaign(name="sse", qr_base_url="https://example.com/landing")
+        db.add(campaign)
+        db.flush()
+        ctv_session = CTVSession(campaign_id=campaign.id, claim_token_hash="hash")
+        db.add(ctv_session)
+        db.commit()
+        return ctv_session.id
+
+
+def add_interaction(session_id: uuid.UUID, created_at: datetime) -> Interaction:
+    interaction = Interaction(session_id=session_id, action_type="tap", payload={}, created_at=created_at)
+    with Session(engine, expire_on_commit=False) as db:
+        db.add(interaction)
+        db.commit()
+    return interaction
+
+
+async def replayed_ids(session_id: uuid.UUID, last_event_id: str, count: int) -> list[str]:
+    async with AsyncSession(async_engine) as db:
+        service = SessionService(db)
+        token = service._create_ctv_token(session_id, datetime.now() + timedelta(minutes=5))
+        stream = await service.open_event_stream(session_id, token, last_event_id)
+        try:
+            frames = [await stream.__anext__() for _ in range(count + 1)]
+        finally:
+            await stream.aclose()
+    events = []
+    for frame in frames[1:]:  # the first frame is the session status
+        data = next(line for line in frame.splitlines() if line.startswith("data: "))
+        events.append(orjson.loads(data.removeprefix("data: "))["id"])
+    return events
+
+
+async def test_replay_includes_rows_written_out_of_order_behind_the_cursor(tables):
+    session_id = seed_session()
+    now = datetime.now()
+    seen = add_interaction(session_id, now - timedelta(seconds=10))
+    # Created before `seen` but committed after the client received `seen`
+    late = add_interaction(session_id, now - timedelta(seconds=10, milliseconds=100))
+    newer = add_interaction(session_id, now - timedelta(seconds=5))
+
+    ids = await replayed_ids(session_id, encode_cursor(seen.created_at, seen.id), 3)
+
+    # The overlap also resends `seen`; clients dedupe by id
+    assert ids == [str(late.id), str(seen.id), str(newer.id)]
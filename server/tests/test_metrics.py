@@ -0,0 +1,53 @@
+from concurrent.futures import ThreadPoolExecutor
+import sys
+
+import pytest
+
+from app.core.metrics import Counter, Gauge, Histogram
+
+THREADS = 8
+UPDATES = 20_000
+
+
+@pytest.fixture(autouse=True)
+def frequent_thread_switches():
+    # Makes a lost update between threads likely, if updates are not atomic
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    yield
+    sys.setswitchinterval(interval)
+
+
+def hammer(update) -> None:
+    def run(_):
+        for _ in range(UPDATES):
+            update()
+
+    with ThreadPoolExecutor(max_workers=THREADS) as pool:
+        list(pool.map(run, range(THREADS)))
+
+
+def test_counter_keeps_every_increment_across_threads():
+    counter = Counter("test_counter_total", "test", labelnames=("route",))
+    hammer(lambda: counter.labels("/").inc())
+    assert counter.labels("/").value == THREADS * UPDATES
+    assert len(counter.children) == 1
+
+
+def test_gauge_inc_and_dec_balance_across_threads():
+    gauge = Gauge("test_gauge", "test")
+
+    def update():
+        gauge.inc()
+        gauge.dec()
+
+    hammer(update)
+    assert gauge.value == 0
+
+
+def test_histogram_count_matches_observations_across_threads():
+    histogram = Histogram("test_seconds", "test", buckets=(0.5,))
+    hammer(lambda: histogram.observe(0.25))
+    samples = {name: value for name, labels, value in histogram.samples() if name != "test_seconds_bucket"}
+    assert samples["test_seconds_count"] == THREADS * UPDATES
+    assert samples["test_seconds_sum"] == pytest.approx(0.25 * THREADS * UPDATES)
@@ -0,0 +1,42 @@
+import uuid
+
+import pytest
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session
+
+from app.core.pagination import decode_cursor, page
+from app.crud.campaign_crud import get_campaigns_page
+from app.db import engine
+from app.models import Campaign
+
+
+def test_rows_inserted_without_created_at_are_paged(tables):
+    # Core inserts skip the model's default_factory: the server default fills created_at
+    with Session(engine) as session:
+        rows = [
+            {"id": uuid.uuid4(), "name": f"c{i}", "qr_base_url": "https://example.com", "is_active": True}
+            for i in range(5)
+        ]
+        session.exec(insert(Campaign).values(rows))
+        session.commit()
+
+        seen, after = [], None
+        while True:
+            rows, cursor = page(get_campaigns_page(after, 2, session), 2)
+            seen += [row.id for row in rows]
+            if cursor is None:
+                break
+            after = decode_cursor(cursor)
+
+    assert len(seen) == len(set(seen)) == 5
+
+
+def test_created_at_cannot_be_null(tables):
+    with Session(engine) as session:
+        with pytest.raises(IntegrityError):
+            session.exec(
+                insert(Campaign).values(
+                    id=uuid.uuid4(), name="null", qr_base_url="https://example.com", is_active=True, created_at=None
+                )
+            )
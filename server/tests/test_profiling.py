@@ -0,0 +1,28 @@
+import sys
+
+import anyio
+import pytest
+from pydantic import ValidationError
+
+from app.core.config import Settings
+from app.core.profiling import Profiler
+
+
+def test_sampling_without_secret_is_rejected():
+    with pytest.raises(ValidationError, match="PROFILING_SECRET"):
+        Settings(PROFILING_SAMPLE_RATE=0.1, PROFILING_SECRET="")
+    assert Settings(PROFILING_SAMPLE_RATE=0.1, PROFILING_SECRET="s").PROFILING_SAMPLE_RATE == 0.1
+
+
+@pytest.mark.anyio
+async def test_no_samples_after_finish():
+    profiler = Profiler(interval=0.0005, keep=5, max_active=4)
+    scope = {"method": "GET", "path": "/profiled"}
+    profile = profiler.begin(scope, sys._getframe())
+    assert profile is not None
+    await anyio.sleep(0.05)
+    profiler.finish(profile, 0.05, "/profiled")
+    samples = profile.samples
+    assert samples > 0
+    await anyio.sleep(0.05)
+    assert profile.samples == samples
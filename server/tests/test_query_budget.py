@@ -0,0 +1,60 @@
+import uuid
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.main import app
+from benchmarks.query_budget import API, BUDGETS
+
+
+@pytest.fixture
+def client(tables, monkeypatch):
+    # Every request sampled, with the statement count in X-DB-Queries
+    monkeypatch.setattr(settings, "SQL_INSTRUMENTATION_SAMPLE_RATE", 1.0)
+    monkeypatch.setattr(settings, "SQL_TIMING_HEADERS", True)
+    with TestClient(app) as client:
+        yield client
+
+
+def test_write_endpoints_stay_within_query_budget(client):
+    counts: dict[str, int] = {}
+
+    def call(endpoint: str, method: str, path: str, **kwargs):
+        response = client.request(method, f"{API}{path}", **kwargs)
+        assert response.is_success, (endpoint, response.status_code, response.text)
+        counts[endpoint] = int(response.headers["X-DB-Queries"])
+        return response.json()
+
+    suffix = uuid.uuid4().hex[:8]
+    call(
+        "POST /user/signup",
+        "POST",
+        "/user/signup",
+        json={"email": f"budget-{suffix}@example.com", "username": f"budget-{suffix}", "plain_password": "pw"},
+    )
+    call("PUT /user/", "PUT", "/user/", json={"bio": "query budget"})
+
+    campaign = call(
+        "POST /campaign/",
+        "POST",
+        "/campaign/",
+        json={"name": "query-budget", "qr_base_url": "https://example.com/landing"},
+    )
+    call("POST /vote/{role}", "POST", "/vote/villageois")
+
+    # Fills the campaign cache, so the measured register below is the steady state
+    client.post(f"{API}/session/register", json={"campaign_id": campaign["id"]})
+    registration = call("POST /session/register", "POST", "/session/register", json={"campaign_id": campaign["id"]})
+    claim = call("POST /session/claim", "POST", "/session/claim", json={"claim_token": registration["claim_token"]})
+    call(
+        "POST /session/interact/{session_id}",
+        "POST",
+        f"/session/interact/{registration['id']}",
+        json={"action_type": "tap", "payload": {}},
+        headers={"Authorization": f"Bearer {claim['interaction_token']}"},
+    )
+
+    assert counts.keys() == BUDGETS.keys()
+    over = {endpoint: (counts[endpoint], budget) for endpoint, budget in BUDGETS.items() if counts[endpoint] > budget}
+    assert not over, f"endpoints over their query budget (queries, budget): {over}"
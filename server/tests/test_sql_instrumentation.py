@@ -0,0 +1,17 @@
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.core.request_metrics import UNMATCHED_ROUTE
+from app.core.sql_instrumentation import queries_per_request
+from app.main import app
+
+
+def test_unmatched_paths_share_one_route_label(monkeypatch):
+    monkeypatch.setattr(settings, "SQL_INSTRUMENTATION_SAMPLE_RATE", 1.0)
+    client = TestClient(app)
+    for i in range(5):
+        assert client.get(f"/scanner/probe-{i}").status_code == 404
+
+    labels = {values[0] for values in queries_per_request.children}
+    assert not any(label.startswith("/scanner") for label in labels)
+    assert UNMATCHED_ROUTE in labels